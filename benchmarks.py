@@ -4,7 +4,7 @@ import sys
 import os
 import traceback
 from pathlib import Path
-from typing import Dict, List, NamedTuple, Optional, cast
+from typing import Dict, List, NamedTuple, Optional, Type, cast
 
 ROOT = Path(__file__).resolve().parent
 SRC_DIR = ROOT / "src"
@@ -16,7 +16,8 @@ import grug
 from grug.entity import Entity, ReraisedGameFnError, StackOverflow, TimeLimitExceeded
 from grug.grug_state import GrugFile, GrugRuntimeErrorType, GrugState
 from grug.grug_value import GrugValue
-from tests.test_grug import (  
+from tests.grug_ctypes import (  
+    GAME_FN_ARGTYPES,
     GrugValueUnion,
     GrugValueWorkaround,
     c_to_py_value,
@@ -146,8 +147,8 @@ def run_benchmarks(mod_api_path: str, mods_dir_path: str, benchmark_lib: ctypes.
         try:
             state = grug.init(
                 runtime_error_handler=_runtime_error_handler,
-                mod_api_path=ctypes.string_at(mod_api_path).decode(),
-                mods_dir_path=ctypes.string_at(mods_dir).decode(),
+                mod_api_path=mod_api_path.decode(),
+                mods_dir_path=mods_dir.decode(),
                 on_fn_time_limit_ms=10_000,
             )
             BenchmarkGameFnRegistrator(state, benchmark_lib).register_game_fns()
@@ -175,9 +176,7 @@ def run_benchmarks(mod_api_path: str, mods_dir_path: str, benchmark_lib: ctypes.
         try:
             assert state
             file_id = _allocate_id()
-            file_by_id[file_id] = state.compile_grug_file(
-                ctypes.string_at(file_path).decode()
-            )
+            file_by_id[file_id] = state.compile_grug_file(file_path.decode())
             return file_id
         except Exception:  
             traceback.print_exc(file=sys.stderr)
@@ -199,7 +198,7 @@ def run_benchmarks(mod_api_path: str, mods_dir_path: str, benchmark_lib: ctypes.
     def get_on_fn_id(state_ptr: int, entity_type: bytes, function_name: bytes) -> int:
         nonlocal on_fn_by_id
         on_fn_id = _allocate_id()
-        on_fn_by_id[on_fn_id] = ctypes.string_at(function_name).decode()
+        on_fn_by_id[on_fn_id] = function_name.decode()
         return on_fn_id
 
     @call_entity_on_fn_t
@@ -217,9 +216,10 @@ def run_benchmarks(mod_api_path: str, mods_dir_path: str, benchmark_lib: ctypes.
             on_fn_name = on_fn_by_id[on_fn_id]
             on_fn_decl = entity.file.on_fns[on_fn_name]
             assert len(on_fn_decl.arguments) == args_len
+            # Slicing reads all arguments in one go, and never touches c_args when it's NULL
             args = [
                 c_to_py_value(arg, argument.type_name)
-                for arg, argument in zip(c_args or [], on_fn_decl.arguments)
+                for arg, argument in zip(c_args[:args_len], on_fn_decl.arguments)
             ]
             entity._run_on_fn(on_fn_name, *args)  # pyright: ignore[reportPrivateUsage]
         except (TimeLimitExceeded, StackOverflow, ReraisedGameFnError):
@@ -256,8 +256,10 @@ class BenchmarkGameFnRegistrator:
         for name in self.state.mod_api["host_functions"]:
             self._register_fn(name)
 
-    def _get_c_args(self, *args: GrugValue):
-        c_args = (GrugValueUnion * len(args))()
+    def _get_c_args(
+        self, c_args_type: "Type[ctypes.Array[GrugValueUnion]]", *args: GrugValue
+    ):
+        c_args = c_args_type()
 
         for i, value in enumerate(args):
             if isinstance(value, float):
@@ -266,38 +268,36 @@ class BenchmarkGameFnRegistrator:
                 c_args[i]._bool = value
             else:
                 assert isinstance(value, int)
-                c_args[i]._id = ctypes.c_uint64(value)
+                c_args[i]._id = value
 
         return c_args
 
     def _unpack_workaround(
-        self, c_workaround: GrugValueWorkaround, return_type: Optional[str]
+        self, bits: int, return_type: Optional[str]
     ) -> Optional[GrugValue]:
         if return_type is None:
             return None
 
-        value = GrugValueUnion()
-        ctypes.memmove(
-            ctypes.byref(value), ctypes.byref(c_workaround), ctypes.sizeof(value)
-        )
-        return c_to_py_value(value, return_type)
+        return c_to_py_value(GrugValueUnion(_id=bits), return_type)
 
     def _register_fn(self, name: str) -> None:
         c_fn = self.benchmark_lib["game_fn_" + name]
 
-        c_fn.argtypes = (
-            ctypes.c_void_p,
-            ctypes.POINTER(GrugValueUnion),
-        )
+        c_fn.argtypes = GAME_FN_ARGTYPES
         c_fn.restype = GrugValueWorkaround
 
-        return_type = self.state.mod_api["host_functions"][name].get("return_type")
+        host_function = self.state.mod_api["host_functions"][name]
+        return_type = host_function.get("return_type")
+        c_args_type = GrugValueUnion * len(host_function.get("arguments", []))
+
+        get_c_args = self._get_c_args
+        unpack_workaround = self._unpack_workaround
 
         def fn(state: GrugState, *args: GrugValue) -> Optional[GrugValue]:
             del state
-            c_args = self._get_c_args(*args)
-            result: GrugValueWorkaround = c_fn(0, c_args)
-            return self._unpack_workaround(result, return_type)
+            c_args = get_c_args(c_args_type, *args)
+            result: int = c_fn(0, c_args)
+            return unpack_workaround(result, return_type)
 
         self.state._register_game_fn(name, fn)  # pyright: ignore[reportPrivateUsage]
 
@@ -240,12 +240,12 @@ class Entity:
     def _run_unary_expr(self, unary_expr: UnaryExpr):
         op = unary_expr.operator
 
-        if op == TokenType.MINUS_TOKEN:
+        if op is TokenType.MINUS_TOKEN:
             number = self._run_expr(unary_expr.expr)
             assert isinstance(number, float)
             return -number
         else:
-            assert op == TokenType.NOT_TOKEN
+            assert op is TokenType.NOT_TOKEN
             return not self._run_expr(unary_expr.expr)
 
     def _run_binary_expr(self, binary_expr: BinaryExpr):
@@ -254,43 +254,43 @@ class Entity:
 
         op = binary_expr.operator
 
-        if op == TokenType.PLUS_TOKEN:
+        if op is TokenType.PLUS_TOKEN:
             assert isinstance(left, float) and isinstance(right, float)
             return left + right
-        elif op == TokenType.MINUS_TOKEN:
+        elif op is TokenType.MINUS_TOKEN:
             assert isinstance(left, float) and isinstance(right, float)
             return left - right
-        elif op == TokenType.MULTIPLICATION_TOKEN:
+        elif op is TokenType.MULTIPLICATION_TOKEN:
             assert isinstance(left, float) and isinstance(right, float)
             return left * right
-        elif op == TokenType.DIVISION_TOKEN:
+        elif op is TokenType.DIVISION_TOKEN:
             assert isinstance(left, float) and isinstance(right, float)
             return left / right
-        elif op == TokenType.EQUALS_TOKEN:
+        elif op is TokenType.EQUALS_TOKEN:
             return left == right
-        elif op == TokenType.NOT_EQUALS_TOKEN:
+        elif op is TokenType.NOT_EQUALS_TOKEN:
             return left != right
-        elif op == TokenType.GREATER_OR_EQUAL_TOKEN:
+        elif op is TokenType.GREATER_OR_EQUAL_TOKEN:
             assert isinstance(left, float) and isinstance(right, float)
             return left >= right
-        elif op == TokenType.GREATER_TOKEN:
+        elif op is TokenType.GREATER_TOKEN:
             assert isinstance(left, float) and isinstance(right, float)
             return left > right
-        elif op == TokenType.LESS_OR_EQUAL_TOKEN:
+        elif op is TokenType.LESS_OR_EQUAL_TOKEN:
             assert isinstance(left, float) and isinstance(right, float)
             return left <= right
         else:
-            assert op == TokenType.LESS_TOKEN
+            assert op is TokenType.LESS_TOKEN
             assert isinstance(left, float) and isinstance(right, float)
             return left < right
 
     def _run_logical_expr(self, logical_expr: LogicalExpr):
-        if logical_expr.operator == TokenType.AND_TOKEN:
+        if logical_expr.operator is TokenType.AND_TOKEN:
             return self._run_expr(logical_expr.left_expr) and self._run_expr(
                 logical_expr.right_expr
             )
         else:
-            assert logical_expr.operator == TokenType.OR_TOKEN
+            assert logical_expr.operator is TokenType.OR_TOKEN
 
             return self._run_expr(logical_expr.left_expr) or self._run_expr(
                 logical_expr.right_expr
@@ -4,6 +4,8 @@ from pathlib import Path
 
 @dataclass
 class SourceSpan:
+    __slots__ = ("line", "offset")
+
     line: int
     offset: int
     
@@ -11,7 +11,7 @@ from .error import GrugError
 from .parser import HelperFn, OnFn, Parser, VariableStatement
 from .serializer import Serializer
 from .tokenizer import Tokenizer
-from .type_propagator import TypePropagator
+from .type_propagator import TypePropagator, parse_host_functions
 
 
 class GrugRuntimeErrorType(Enum):
@@ -97,6 +97,13 @@ class GrugState:
 
         self._assert_mod_api()
 
+        # Every compiled file shares these, instead of deriving them from the mod API again
+        self.host_functions = parse_host_functions(self.mod_api)
+        self.game_fn_return_types: Dict[str, Optional[str]] = {
+            fn_name: fn.get("return_type")
+            for fn_name, fn in self.mod_api["host_functions"].items()
+        }
+
         self.mods_dir_path = mods_dir_path
 
         self.on_fn_time_limit_ms = on_fn_time_limit_ms
@@ -171,7 +178,13 @@ class GrugState:
         ast = Parser(tokens, grug_file_path, text).parse()
 
         TypePropagator(
-            ast, mod, entity_type, self.mod_api, grug_file_path, text
+            ast,
+            mod,
+            entity_type,
+            self.mod_api,
+            self.host_functions,
+            grug_file_path,
+            text,
         ).fill()
 
         global_variables = [s for s in ast if isinstance(s, VariableStatement)]
@@ -180,11 +193,6 @@ class GrugState:
 
         helper_fns = {s.fn_name: s for s in ast if isinstance(s, HelperFn)}
 
-        game_fn_return_types = {
-            fn_name: fn.get("return_type")
-            for fn_name, fn in self.mod_api["host_functions"].items()
-        }
-
         return GrugFile(
             grug_file_relative_path,
             mod,
@@ -192,7 +200,7 @@ class GrugState:
             on_fns,
             helper_fns,
             self.game_fns,
-            game_fn_return_types,
+            self.game_fn_return_types,
             self,
         )
 
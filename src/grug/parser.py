@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import math
 import struct
 from dataclasses import dataclass, field
 from enum import Enum, auto
@@ -12,8 +11,26 @@ from .tokenizer import SPACES_PER_INDENT, Token, TokenType
 
 MAX_PARSING_DEPTH = 100
 
-MIN_F64 = struct.unpack("!d", struct.pack("!Q", 0x0010000000000000))[0]
-MAX_F64 = struct.unpack("!d", struct.pack("!Q", 0x7FEFFFFFFFFFFFFF))[0]
+F64_EXPONENT_MASK = 0x7FF0000000000000
+F64_MANTISSA_MASK = 0x000FFFFFFFFFFFFF
+
+UNARY_OPERATORS = frozenset((TokenType.MINUS_TOKEN, TokenType.NOT_TOKEN))
+# How tightly each binary operator binds, from loosest to tightest
+BINARY_OPERATOR_PRECEDENCES = {
+    TokenType.OR_TOKEN: 1,
+    TokenType.AND_TOKEN: 2,
+    TokenType.EQUALS_TOKEN: 3,
+    TokenType.NOT_EQUALS_TOKEN: 3,
+    TokenType.GREATER_OR_EQUAL_TOKEN: 4,
+    TokenType.GREATER_TOKEN: 4,
+    TokenType.LESS_OR_EQUAL_TOKEN: 4,
+    TokenType.LESS_TOKEN: 4,
+    TokenType.PLUS_TOKEN: 5,
+    TokenType.MINUS_TOKEN: 5,
+    TokenType.MULTIPLICATION_TOKEN: 6,
+    TokenType.DIVISION_TOKEN: 6,
+}
+LOGICAL_OPERATORS = frozenset((TokenType.AND_TOKEN, TokenType.OR_TOKEN))
 
 
 @dataclass
@@ -31,6 +48,16 @@ class Type(Enum):
     ENTITY = auto()
 
 
+# Any other type name is an ID type, like a custom one from mod_api.json
+TYPE_NAMES = {
+    "bool": Type.BOOL,
+    "number": Type.NUMBER,
+    "string": Type.STRING,
+    "resource": Type.RESOURCE,
+    "entity": Type.ENTITY,
+}
+
+
 @dataclass
 class Result:
     type: Optional[Type] = None
@@ -250,13 +277,16 @@ Ast = List[
 class Parser:
     def __init__(self, tokens: List[Token], file_path: Path, source_text: str):
         self.tokens = tokens
+        # The expression loops only need to look at token types,
+        # so they're stored alongside the tokens
+        self.token_types = [token.type for token in tokens]
+        # The index of the next token, shared by all parse methods
+        self.i = 0
         self.file_path = file_path
         self.source_text = source_text
         self.ast: Ast = []
         self.helper_fns: Dict[str, HelperFn] = {}
         self.on_fns: Dict[str, OnFn] = {}
-        self.statements = []
-        self.arguments = []
         self.parsing_depth = 0
         self.loop_depth = 0
         self.indentation = 0
@@ -278,21 +308,20 @@ class Parser:
         # We never call token_span if self.tokens is empty
         return self.tokens[-1].span
 
-    def parse(self):
+    def parse(self) -> Ast:
         seen_on_fn = False
         seen_newline = False
         newline_allowed = False
         newline_required = False
 
         try: 
-            i = [0]  # Use a list to allow modification by called functions
-            while i[0] < len(self.tokens):
-                token = self.tokens[i[0]]
+            while self.i < len(self.tokens):
+                token = self.tokens[self.i]
 
                 if (
-                    token.type == TokenType.WORD_TOKEN
-                    and i[0] + 1 < len(self.tokens)
-                    and self.tokens[i[0] + 1].type == TokenType.COLON_TOKEN
+                    token.type is TokenType.WORD_TOKEN
+                    and self.i + 1 < len(self.tokens)
+                    and self.tokens[self.i + 1].type is TokenType.COLON_TOKEN
                 ):
                     if seen_on_fn:
                         raise self.new_error(
@@ -300,9 +329,9 @@ class Parser:
                             "Cannot declare member variables after on_ functions"
                         )
 
-                    self.ast.append(self.parse_global_variable(i))
+                    self.ast.append(self.parse_global_variable())
 
-                    self.consume_token_type(i, TokenType.NEWLINE_TOKEN)
+                    self.consume_token_type(TokenType.NEWLINE_TOKEN)
 
                     newline_allowed = True
                     newline_required = True
@@ -310,17 +339,17 @@ class Parser:
                     continue
 
                 elif (
-                    token.type == TokenType.EXPORT_TOKEN
+                    token.type is TokenType.EXPORT_TOKEN
                 ):
-                    self.assert_token_type(i[0] + 1, TokenType.SPACE_TOKEN)
-                    name_token = self.peek_token(i[0] + 2)
+                    self.assert_token_type(self.i + 1, TokenType.SPACE_TOKEN)
+                    name_token = self.peek_token(self.i + 2)
                     if newline_required:
                         raise ParserError(
                             name_token.span,
                             f"Expected an empty line"
                         )
 
-                    fn = self.parse_export_fn(i)
+                    fn = self.parse_export_fn()
                     if fn.fn_name in self.on_fns:
                         raise GrugError.new_compile_error(
                             self.file_path,
@@ -331,7 +360,7 @@ class Parser:
                         )
                     self.on_fns[fn.fn_name] = fn
 
-                    self.consume_token_type(i, TokenType.NEWLINE_TOKEN)
+                    self.consume_token_type(TokenType.NEWLINE_TOKEN)
 
                     seen_on_fn = True
 
@@ -341,18 +370,18 @@ class Parser:
                     continue
 
                 elif (
-                    token.type == TokenType.LOCAL_TOKEN
+                    token.type is TokenType.LOCAL_TOKEN
                 ):
-                    self.assert_token_type(i[0] + 1, TokenType.SPACE_TOKEN)
-                    self.assert_token_type(i[0] + 2, TokenType.WORD_TOKEN)
-                    name_token = self.peek_token(i[0] + 2)
+                    self.assert_token_type(self.i + 1, TokenType.SPACE_TOKEN)
+                    self.assert_token_type(self.i + 2, TokenType.WORD_TOKEN)
+                    name_token = self.peek_token(self.i + 2)
                     if newline_required:
                         raise ParserError(
                             name_token.span,
                             f"Expected an empty line"
                         )
 
-                    fn = self.parse_local_fn(i)
+                    fn = self.parse_local_fn()
                     if fn.fn_name in self.helper_fns:
                         raise GrugError.new_compile_error(
                             self.file_path,
@@ -363,14 +392,14 @@ class Parser:
                         )
                     self.helper_fns[fn.fn_name] = fn
 
-                    self.consume_token_type(i, TokenType.NEWLINE_TOKEN)
+                    self.consume_token_type(TokenType.NEWLINE_TOKEN)
 
                     newline_allowed = True
                     newline_required = True
 
                     continue
 
-                elif token.type == TokenType.NEWLINE_TOKEN:
+                elif token.type is TokenType.NEWLINE_TOKEN:
                     if not newline_allowed:
                         raise ParserError(
                             token.span,
@@ -383,20 +412,20 @@ class Parser:
                     newline_required = False
 
                     self.ast.append(EmptyLineStatement())
-                    i[0] += 1
+                    self.i += 1
                     continue
 
-                elif token.type == TokenType.COMMENT_TOKEN:
+                elif token.type is TokenType.COMMENT_TOKEN:
                     newline_allowed = True
                     self.ast.append(CommentStatement(token.value, token.span))
-                    i[0] += 1
-                    self.consume_token_type(i, TokenType.NEWLINE_TOKEN)
+                    self.i += 1
+                    self.consume_token_type(TokenType.NEWLINE_TOKEN)
                     continue
 
                 else:
                     raise ParserError(
                         token.span,
-                        f"Unexpected token '{token.value}' on line {self.get_token_line_number(i[0])}"
+                        f"Unexpected token '{token.value}' on line {self.get_token_line_number(self.i)}"
                     )
 
             if seen_newline and not newline_allowed:
@@ -409,7 +438,7 @@ class Parser:
 
         return self.ast
 
-    def peek_token(self, token_index: int):
+    def peek_token(self, token_index: int) -> Token:
         if token_index >= len(self.tokens):
             raise ParserError(
                 self.token_span(token_index),
@@ -417,132 +446,117 @@ class Parser:
             )
         return self.tokens[token_index]
 
-    def consume_token(self, i: List[int]):
-        token_index = i[0]
+    def consume_token(self) -> Token:
+        token_index = self.i
         token = self.peek_token(token_index)
-        i[0] += 1
+        self.i += 1
         return token
 
-    def assert_token_type(self, token_index: int, expected_type: TokenType):
-        try: 
-            token = self.peek_token(token_index)
-        except Exception as _:
+    def assert_token_type(self, token_index: int, expected_type: TokenType) -> None:
+        if token_index >= len(self.tokens):
             raise ParserError(
                 self.token_span(token_index),
                 f"Expected {expected_type} but got end of file"
             )
-        if token.type != expected_type:
+        token = self.tokens[token_index]
+        if token.type is not expected_type:
             raise ParserError(
                 token.span,
                 f"Expected {expected_type} but got {token.type}"
             )
 
-    def consume_token_type(self, i: List[int], expected_type: TokenType):
-        self.assert_token_type(i[0], expected_type)
-        i[0] += 1
-        return self.tokens[i[0] - 1]
+    def consume_token_type(self, expected_type: TokenType) -> Token:
+        self.assert_token_type(self.i, expected_type)
+        self.i += 1
+        return self.tokens[self.i - 1]
 
-    def get_token_line_number(self, token_index: int):
+    def get_token_line_number(self, token_index: int) -> int:
         assert token_index < len(self.tokens)
-        line_number = 1
-        for idx in range(token_index):
-            if self.tokens[idx].type == TokenType.NEWLINE_TOKEN:
-                line_number += 1
-        return line_number
-
-    def parse_statement(self, i: List[int]):
-        self.increase_parsing_depth(i)
-        switch_token = self.peek_token(i[0])
-
-        if switch_token.type == TokenType.WORD_TOKEN:
-            token = self.peek_token(i[0] + 1)
-            if token.type == TokenType.OPEN_PARENTHESIS_TOKEN:
-                expr = self.parse_call(i)
-
-                # The above `token.type == TokenType.OPEN_PARENTHESIS_TOKEN` guarantees that in `parse_call()`
-                # the early Expr return in `if token.type != TokenType.OPEN_PARENTHESIS_TOKEN` is not reached.
+        return self.token_types[:token_index].count(TokenType.NEWLINE_TOKEN) + 1
+
+    def parse_statement(self) -> Statement:
+        self.increase_parsing_depth()
+        switch_token = self.peek_token(self.i)
+
+        if switch_token.type is TokenType.WORD_TOKEN:
+            token = self.peek_token(self.i + 1)
+            if token.type is TokenType.OPEN_PARENTHESIS_TOKEN:
+                expr = self.parse_call()
+
+                # The above `token.type is TokenType.OPEN_PARENTHESIS_TOKEN` guarantees that in `parse_call()`
+                # the early Expr return in `if token.type is not TokenType.OPEN_PARENTHESIS_TOKEN` is not reached.
                 assert isinstance(expr, CallExpr)
 
                 statement = CallStatement(expr)
             elif (
-                token.type == TokenType.COLON_TOKEN
-                or token.type == TokenType.SPACE_TOKEN
+                token.type is TokenType.COLON_TOKEN
+                or token.type is TokenType.SPACE_TOKEN
             ):
-                statement = self.parse_local_variable(i)
+                statement = self.parse_local_variable()
             else:
                 raise ParserError(
-                    self.peek_token(i[0] + 1).span,
-                    f"Expected '(', or ':', or ' =' after the word '{switch_token.value}' on line {self.get_token_line_number(i[0])}"
+                    self.peek_token(self.i + 1).span,
+                    f"Expected '(', or ':', or ' =' after the word '{switch_token.value}' on line {self.get_token_line_number(self.i)}"
                 )
-        elif switch_token.type == TokenType.IF_TOKEN:
-            statement = self.parse_if_statement(i)
-        elif switch_token.type == TokenType.RETURN_TOKEN:
-            i[0] += 1
-            token = self.peek_token(i[0])
-            if token.type == TokenType.NEWLINE_TOKEN:
+        elif switch_token.type is TokenType.IF_TOKEN:
+            statement = self.parse_if_statement()
+        elif switch_token.type is TokenType.RETURN_TOKEN:
+            self.i += 1
+            token = self.peek_token(self.i)
+            if token.type is TokenType.NEWLINE_TOKEN:
                 statement = ReturnStatement(switch_token.span)
             else:
-                self.consume_space(i)
-                expr = self.parse_expression(i)
+                self.consume_space()
+                expr = self.parse_expression()
                 statement = ReturnStatement(switch_token.span, expr)
-        elif switch_token.type == TokenType.WHILE_TOKEN:
-            i[0] += 1
-            statement = self.parse_while_statement(i)
-        elif switch_token.type == TokenType.BREAK_TOKEN:
+        elif switch_token.type is TokenType.WHILE_TOKEN:
+            self.i += 1
+            statement = self.parse_while_statement()
+        elif switch_token.type is TokenType.BREAK_TOKEN:
             if self.loop_depth == 0:
                 raise self.new_error(
                     switch_token.span,
                     f"There is a break statement that isn't inside of a while loop"
                 )
-            i[0] += 1
+            self.i += 1
             statement = BreakStatement(switch_token.span)
-        elif switch_token.type == TokenType.CONTINUE_TOKEN:
+        elif switch_token.type is TokenType.CONTINUE_TOKEN:
             if self.loop_depth == 0:
                 raise self.new_error(
                     switch_token.span,
                     f"There is a continue statement that isn't inside of a while loop"
                 )
-            i[0] += 1
+            self.i += 1
             statement = ContinueStatement(switch_token.span)
-        elif switch_token.type == TokenType.COMMENT_TOKEN:
-            i[0] += 1
+        elif switch_token.type is TokenType.COMMENT_TOKEN:
+            self.i += 1
             statement = CommentStatement(switch_token.value, switch_token.span)
         else:
             raise ParserError(
                 switch_token.span,
-                f"Expected a statement token, but got {switch_token.type} on line {self.get_token_line_number(i[0])}"
+                f"Expected a statement token, but got {switch_token.type} on line {self.get_token_line_number(self.i)}"
             )
 
         self.decrease_parsing_depth()
         return statement
 
     @staticmethod
-    def parse_type(type_str: str):
-        if type_str == "bool":
-            return Type.BOOL
-        if type_str == "number":
-            return Type.NUMBER
-        if type_str == "string":
-            return Type.STRING
-        if type_str == "resource":
-            return Type.RESOURCE
-        if type_str == "entity":
-            return Type.ENTITY
-        return Type.ID
-
-    def parse_arguments(self, i: List[int]):
+    def parse_type(type_str: str) -> Type:
+        return TYPE_NAMES.get(type_str, Type.ID)
+
+    def parse_arguments(self) -> List[Argument]:
         arguments: List[Argument] = []
 
         # First argument
-        name_token = self.consume_token(i)
+        name_token = self.consume_token()
         arg_name = name_token.value
 
-        self.consume_token_type(i, TokenType.COLON_TOKEN)
+        self.consume_token_type(TokenType.COLON_TOKEN)
 
-        self.consume_space(i)
+        self.consume_space()
 
-        self.assert_token_type(i[0], TokenType.WORD_TOKEN)
-        type_token = self.consume_token(i)
+        self.assert_token_type(self.i, TokenType.WORD_TOKEN)
+        type_token = self.consume_token()
 
         type_name = type_token.value
         arg_type = Parser.parse_type(type_name)
@@ -565,22 +579,22 @@ class Parser:
 
         # Every argument after the first one starts with a comma
         while True:
-            token = self.peek_token(i[0])
-            if token.type != TokenType.COMMA_TOKEN:
+            token = self.peek_token(self.i)
+            if token.type is not TokenType.COMMA_TOKEN:
                 break
-            i[0] += 1
+            self.i += 1
 
-            self.consume_space(i)
-            self.assert_token_type(i[0], TokenType.WORD_TOKEN)
-            name_token = self.consume_token(i)
+            self.consume_space()
+            self.assert_token_type(self.i, TokenType.WORD_TOKEN)
+            name_token = self.consume_token()
             arg_name = name_token.value
 
-            self.consume_token_type(i, TokenType.COLON_TOKEN)
+            self.consume_token_type(TokenType.COLON_TOKEN)
 
-            self.consume_space(i)
+            self.consume_space()
 
-            self.assert_token_type(i[0], TokenType.WORD_TOKEN)
-            type_token = self.consume_token(i)
+            self.assert_token_type(self.i, TokenType.WORD_TOKEN)
+            type_token = self.consume_token()
 
             type_name = type_token.value
             arg_type = Parser.parse_type(type_name)
@@ -603,13 +617,13 @@ class Parser:
 
         return arguments
 
-    def parse_local_fn(self, i: List[int]):
+    def parse_local_fn(self) -> HelperFn:
         # local token
-        self.consume_token(i)
+        self.consume_token()
         # space token
-        self.consume_space(i)
+        self.consume_space()
 
-        fn_name = self.consume_token(i)
+        fn_name = self.consume_token()
 
         fn = HelperFn(fn_name.value, fn_name.span)
         self.current_function = fn.fn_name
@@ -626,18 +640,18 @@ class Parser:
                 f"{fn.fn_name}() is defined before the first time it gets called"
             )
 
-        self.consume_token_type(i, TokenType.OPEN_PARENTHESIS_TOKEN)
+        self.consume_token_type(TokenType.OPEN_PARENTHESIS_TOKEN)
 
-        token = self.peek_token(i[0])
-        if token.type == TokenType.WORD_TOKEN:
-            fn.arguments = self.parse_arguments(i)
+        token = self.peek_token(self.i)
+        if token.type is TokenType.WORD_TOKEN:
+            fn.arguments = self.parse_arguments()
 
-        self.consume_token_type(i, TokenType.CLOSE_PARENTHESIS_TOKEN)
+        self.consume_token_type(TokenType.CLOSE_PARENTHESIS_TOKEN)
 
-        self.assert_token_type(i[0], TokenType.SPACE_TOKEN)
-        token = self.peek_token(i[0] + 1)
-        if token.type == TokenType.WORD_TOKEN:
-            i[0] += 2
+        self.assert_token_type(self.i, TokenType.SPACE_TOKEN)
+        token = self.peek_token(self.i + 1)
+        if token.type is TokenType.WORD_TOKEN:
+            self.i += 2
             fn.return_type = Parser.parse_type(token.value)
             fn.return_type_name = token.value
 
@@ -648,7 +662,7 @@ class Parser:
                 )
 
         self.indentation = 0
-        fn.body_statements = self.parse_statements(i)
+        fn.body_statements = self.parse_statements()
 
         if all(
             isinstance(s, (EmptyLineStatement, CommentStatement))
@@ -660,13 +674,13 @@ class Parser:
         self.current_function = None
         return fn
 
-    def parse_export_fn(self, i: List[int]):
+    def parse_export_fn(self) -> OnFn:
         # export token
-        self.consume_token(i)
+        self.consume_token()
         # space token
-        self.consume_space(i)
+        self.consume_space()
         # name token
-        name_token = self.consume_token_type(i, TokenType.WORD_TOKEN)
+        name_token = self.consume_token_type(TokenType.WORD_TOKEN)
         if self.helper_fns:
             raise GrugError.new_compile_error(
                 self.file_path,
@@ -680,13 +694,13 @@ class Parser:
         previous_function = self.current_function
         self.current_function = fn.fn_name
 
-        self.consume_token_type(i, TokenType.OPEN_PARENTHESIS_TOKEN)
-        next_tok = self.peek_token(i[0])
-        if next_tok.type == TokenType.WORD_TOKEN:
-            fn.arguments = self.parse_arguments(i)
-        self.consume_token_type(i, TokenType.CLOSE_PARENTHESIS_TOKEN)
+        self.consume_token_type(TokenType.OPEN_PARENTHESIS_TOKEN)
+        next_tok = self.peek_token(self.i)
+        if next_tok.type is TokenType.WORD_TOKEN:
+            fn.arguments = self.parse_arguments()
+        self.consume_token_type(TokenType.CLOSE_PARENTHESIS_TOKEN)
 
-        fn.body_statements = self.parse_statements(i)
+        fn.body_statements = self.parse_statements()
         if all(
             isinstance(s, (EmptyLineStatement, CommentStatement))
             for s in fn.body_statements
@@ -697,93 +711,100 @@ class Parser:
         self.current_function = previous_function
         return fn
 
-    def parse_statements(self, i: List[int]):
+    def parse_statements(self) -> List[Statement]:
         stmts: List[Statement] = []
 
-        self.increase_parsing_depth(i)
-        self.consume_space(i)
-        self.consume_token_type(i, TokenType.OPEN_BRACE_TOKEN)
-        self.consume_token_type(i, TokenType.NEWLINE_TOKEN)
+        self.increase_parsing_depth()
+        self.consume_space()
+        self.consume_token_type(TokenType.OPEN_BRACE_TOKEN)
+        self.consume_token_type(TokenType.NEWLINE_TOKEN)
 
         self.indentation += 1
 
         seen_newline = False
         newline_allowed = False
 
+        # Bound once, since this loop runs for every statement in the block
+        is_end_of_block = self.is_end_of_block
+        peek_token = self.peek_token
+        consume_indentation = self.consume_indentation
+        parse_statement = self.parse_statement
+        consume_token_type = self.consume_token_type
+        add_stmt = stmts.append
+
         while True:
-            if self.is_end_of_block(i):
+            if is_end_of_block():
                 break
 
-            tok = self.peek_token(i[0])
-            if tok.type == TokenType.NEWLINE_TOKEN:
+            tok = peek_token(self.i)
+            if tok.type is TokenType.NEWLINE_TOKEN:
                 if not newline_allowed:
                     raise ParserError(
                         tok.span,
                         f"Unexpected empty line"
                     )
-                i[0] += 1
+                self.i += 1
                 seen_newline = True
                 newline_allowed = False
-                stmts.append(EmptyLineStatement())
+                add_stmt(EmptyLineStatement())
             else:
                 newline_allowed = True
 
-                self.consume_indentation(i)
-                if self.peek_token(i[0]).type == TokenType.NEWLINE_TOKEN:
+                consume_indentation()
+                if peek_token(self.i).type is TokenType.NEWLINE_TOKEN:
                     raise ParserError(
                         tok.span,
                         "Empty line cannot have indentation"
                     )
 
-                stmt = self.parse_statement(i)
-                stmts.append(stmt)
+                add_stmt(parse_statement())
 
-                self.consume_token_type(i, TokenType.NEWLINE_TOKEN)
+                consume_token_type(TokenType.NEWLINE_TOKEN)
 
         if seen_newline and not newline_allowed:
             raise ParserError(
-                self.token_span(i[0] - 1),
+                self.token_span(self.i - 1),
                 f"Unexpected empty line"
             )
 
         self.indentation -= 1
 
         if self.indentation > 0:
-            self.consume_indentation(i)
+            self.consume_indentation()
 
-        self.consume_token_type(i, TokenType.CLOSE_BRACE_TOKEN)
+        self.consume_token_type(TokenType.CLOSE_BRACE_TOKEN)
 
         self.decrease_parsing_depth()
 
         return stmts
 
-    def consume_space(self, i: List[int]):
-        tok = self.peek_token(i[0])
-        if tok.type != TokenType.SPACE_TOKEN:
+    def consume_space(self) -> None:
+        tok = self.peek_token(self.i)
+        if tok.type is not TokenType.SPACE_TOKEN:
             raise ParserError(
                 tok.span,
                 f"Expected token type SPACE_TOKEN, but got {tok.type}"
             )
-        i[0] += 1
+        self.i += 1
 
-    def consume_indentation(self, i: List[int]):
-        self.assert_token_type(i[0], TokenType.INDENTATION_TOKEN)
-        spaces = len(self.peek_token(i[0]).value)
+    def consume_indentation(self) -> None:
+        self.assert_token_type(self.i, TokenType.INDENTATION_TOKEN)
+        spaces = len(self.peek_token(self.i).value)
         expected = self.indentation * SPACES_PER_INDENT
         if spaces != expected:
             raise ParserError(
-                self.peek_token(i[0]).span,
+                self.peek_token(self.i).span,
                 f"Expected {expected} spaces, but got {spaces} spaces"
             )
-        i[0] += 1
+        self.i += 1
 
-    def is_end_of_block(self, i: List[int]):
-        tok = self.peek_token(i[0])
-        if tok.type == TokenType.CLOSE_BRACE_TOKEN:
+    def is_end_of_block(self) -> bool:
+        tok = self.peek_token(self.i)
+        if tok.type is TokenType.CLOSE_BRACE_TOKEN:
             return True
-        elif tok.type == TokenType.NEWLINE_TOKEN:
+        elif tok.type is TokenType.NEWLINE_TOKEN:
             return False
-        elif tok.type == TokenType.INDENTATION_TOKEN:
+        elif tok.type is TokenType.INDENTATION_TOKEN:
             spaces = len(tok.value)
             return spaces == (self.indentation - 1) * SPACES_PER_INDENT
         else:
@@ -792,28 +813,28 @@ class Parser:
                 f"Expected indentation, line break, or '}}' but got '{tok.value}'"
             )
 
-    def increase_parsing_depth(self, i: List[int]):
+    def increase_parsing_depth(self) -> None:
         self.parsing_depth += 1
         # TODO: We don't cover this test yet
         if self.parsing_depth >= MAX_PARSING_DEPTH: # pragma: no cover
             raise ParserError(
-                self.token_span(i[0]),
+                self.token_span(self.i),
                 f"There is a function that contains more than {MAX_PARSING_DEPTH} levels of nested expressions"
             )
 
-    def decrease_parsing_depth(self):
+    def decrease_parsing_depth(self) -> None:
         assert self.parsing_depth > 0
         self.parsing_depth -= 1
 
-    def parse_local_variable(self, i: List[int]):
-        var_token = self.consume_token(i)
+    def parse_local_variable(self) -> VariableStatement:
+        var_token = self.consume_token()
         var_name = var_token.value
 
         var_type = None
         var_type_name = None
 
-        if self.peek_token(i[0]).type == TokenType.COLON_TOKEN:
-            i[0] += 1
+        if self.peek_token(self.i).type is TokenType.COLON_TOKEN:
+            self.i += 1
 
             if var_name == "me":
                 raise self.new_error(
@@ -821,10 +842,10 @@ class Parser:
                     "variable cannot be named 'me'"
                 )
 
-            self.consume_space(i)
+            self.consume_space()
 
-            self.assert_token_type(i[0], TokenType.WORD_TOKEN)
-            type_token = self.consume_token(i)
+            self.assert_token_type(self.i, TokenType.WORD_TOKEN)
+            type_token = self.consume_token()
 
             var_type_name = type_token.value
             var_type = Parser.parse_type(var_type_name)
@@ -835,17 +856,17 @@ class Parser:
                     f"The variable '{var_name}' can't have '{var_type_name}' as its type"
                 )
 
-        if self.peek_token(i[0]).type != TokenType.SPACE_TOKEN:
-            next_token = self.peek_token(i[0])
+        if self.peek_token(self.i).type is not TokenType.SPACE_TOKEN:
+            next_token = self.peek_token(self.i)
             err_span = SourceSpan(next_token.span.line, next_token.span.offset)
             raise self.new_error(
                 err_span,
                 f"Variable '{var_name}' was not assigned a value"
             )
 
-        self.consume_space(i)
+        self.consume_space()
 
-        self.consume_token_type(i, TokenType.ASSIGNMENT_TOKEN)
+        self.consume_token_type(TokenType.ASSIGNMENT_TOKEN)
 
         if var_name == "me":
             raise self.new_error(
@@ -853,14 +874,14 @@ class Parser:
                 "Assigning a new value to the entity's 'me' variable is not allowed"
             )
 
-        self.consume_space(i)
+        self.consume_space()
 
-        expr = self.parse_expression(i)
+        expr = self.parse_expression()
 
         return VariableStatement(var_name, var_type, var_type_name, expr, var_token.span)
 
-    def parse_global_variable(self, i: List[int]):
-        name_token = self.consume_token(i)
+    def parse_global_variable(self) -> VariableStatement:
+        name_token = self.consume_token()
         global_name = name_token.value
 
         if global_name == "me":
@@ -869,11 +890,11 @@ class Parser:
                 "variable cannot be named 'me'"
             )
 
-        self.consume_token_type(i, TokenType.COLON_TOKEN)
-        self.consume_space(i)
+        self.consume_token_type(TokenType.COLON_TOKEN)
+        self.consume_space()
 
-        self.assert_token_type(i[0], TokenType.WORD_TOKEN)
-        type_token = self.consume_token(i)
+        self.assert_token_type(self.i, TokenType.WORD_TOKEN)
+        type_token = self.consume_token()
 
         global_type_name = type_token.value
         global_type = Parser.parse_type(global_type_name)
@@ -884,47 +905,47 @@ class Parser:
                 f"The global variable '{global_name}' can't have '{global_type_name}' as its type"
             )
 
-        if self.peek_token(i[0]).type != TokenType.SPACE_TOKEN:
+        if self.peek_token(self.i).type is not TokenType.SPACE_TOKEN:
             raise self.new_error(
                 SourceSpan(type_token.span.line, type_token.span.offset + len(type_token.value)),
                 f"The global variable '{global_name}' was not assigned a value"
             )
 
-        self.consume_space(i)
-        self.consume_token_type(i, TokenType.ASSIGNMENT_TOKEN)
+        self.consume_space()
+        self.consume_token_type(TokenType.ASSIGNMENT_TOKEN)
 
-        self.consume_space(i)
-        expr = self.parse_expression(i)
+        self.consume_space()
+        expr = self.parse_expression()
 
         return VariableStatement(
             global_name, global_type, global_type_name, expr, name_token.span
         )
 
-    def parse_unary(self, i: List[int]):
-        self.increase_parsing_depth(i)
-        token = self.peek_token(i[0])
-        if token.type in (TokenType.MINUS_TOKEN, TokenType.NOT_TOKEN):
-            i[0] += 1
-            if token.type == TokenType.NOT_TOKEN:
-                self.consume_space(i)
+    def parse_unary(self) -> Expr:
+        self.increase_parsing_depth()
+        token = self.peek_token(self.i)
+        if token.type in UNARY_OPERATORS:
+            self.i += 1
+            if token.type is TokenType.NOT_TOKEN:
+                self.consume_space()
             expr = UnaryExpr(
                 token.type,
-                self.parse_unary(i),
+                self.parse_unary(),
                 expr_span=token.span,
                 op_span=token.span,
             )
             self.decrease_parsing_depth()
             return expr
         self.decrease_parsing_depth()
-        return self.parse_call(i)
+        return self.parse_call()
 
-    def parse_call(self, i: List[int]):
-        self.increase_parsing_depth(i)
+    def parse_call(self) -> Expr:
+        self.increase_parsing_depth()
 
-        expr = self.parse_primary(i)
+        expr = self.parse_primary()
 
-        token = self.peek_token(i[0])
-        if token.type != TokenType.OPEN_PARENTHESIS_TOKEN:
+        token = self.peek_token(self.i)
+        if token.type is not TokenType.OPEN_PARENTHESIS_TOKEN:
             self.decrease_parsing_depth()
             return expr
 
@@ -935,83 +956,83 @@ class Parser:
             )
 
         fn_name = expr.name
-        expr = CallExpr(fn_name, expr_span=expr.expr_span, name_span=expr.expr_span)
+        # The arguments list is handed to the CallExpr as-is,
+        # so no throwaway default list gets allocated per call
+        arguments: List[Expr] = []
+        expr = CallExpr(fn_name, expr.expr_span, expr.expr_span, arguments)
 
         if fn_name.startswith("_"):
             self.called_helper_fn_names.add(fn_name)
 
-        i[0] += 1
+        self.i += 1
 
-        token = self.peek_token(i[0])
-        if token.type == TokenType.CLOSE_PARENTHESIS_TOKEN:
-            i[0] += 1
+        token = self.peek_token(self.i)
+        if token.type is TokenType.CLOSE_PARENTHESIS_TOKEN:
+            self.i += 1
             self.decrease_parsing_depth()
             return expr
 
         while True:
-            arg = self.parse_expression(i)
-            expr.arguments.append(arg)
+            arguments.append(self.parse_expression())
 
-            token = self.peek_token(i[0])
-            if token.type != TokenType.COMMA_TOKEN:
-                self.consume_token_type(i, TokenType.CLOSE_PARENTHESIS_TOKEN)
+            token = self.peek_token(self.i)
+            if token.type is not TokenType.COMMA_TOKEN:
+                self.consume_token_type(TokenType.CLOSE_PARENTHESIS_TOKEN)
                 break
-            i[0] += 1
-            self.consume_space(i)
+            self.i += 1
+            self.consume_space()
 
         self.decrease_parsing_depth()
         return expr
 
-    def str_to_number(self, s: str, span: SourceSpan):
+    def str_to_number(self, s: str, span: SourceSpan) -> float:
         f = float(s)
+        bits = struct.unpack("!Q", struct.pack("!d", f))[0]
+        exponent = bits & F64_EXPONENT_MASK
 
-        # Overflow
-        if not math.isfinite(f) or abs(f) > MAX_F64:
+        # Overflow, since an exponent of all ones means infinity
+        if exponent == F64_EXPONENT_MASK:
             raise self.new_error(span, f"The number {s} is too big")
 
-        # Underflow
-        if f != 0.0 and abs(f) < MIN_F64:
-            raise self.new_error(span, f"The number {s} is too close to zero")
-
-        # Check if conversion resulted in zero due to underflow
-        if f == 0.0:
-            # Check if the string actually represents zero or if it underflowed
-            if any(c in s for c in "123456789"):
+        # An exponent of zero means the number is either subnormal or zero
+        if exponent == 0:
+            # Underflow, or the string doesn't represent zero but got rounded to it
+            if bits & F64_MANTISSA_MASK or any(c in s for c in "123456789"):
                 raise self.new_error(span, f"The number {s} is too close to zero")
 
         return f
 
-    def parse_primary(self, i: List[int]):
-        self.increase_parsing_depth(i)
+    def parse_primary(self) -> Expr:
+        self.increase_parsing_depth()
 
-        token = self.peek_token(i[0])
+        token = self.peek_token(self.i)
 
         expr: Expr
 
-        if token.type == TokenType.OPEN_PARENTHESIS_TOKEN:
-            i[0] += 1
-            expr = ParenthesizedExpr(self.parse_expression(i), expr_span=token.span)
-            self.consume_token_type(i, TokenType.CLOSE_PARENTHESIS_TOKEN)
-        elif token.type == TokenType.TRUE_TOKEN:
-            i[0] += 1
+        if token.type is TokenType.OPEN_PARENTHESIS_TOKEN:
+            self.i += 1
+            expr = ParenthesizedExpr(self.parse_expression(), expr_span=token.span)
+            self.consume_token_type(TokenType.CLOSE_PARENTHESIS_TOKEN)
+        elif token.type is TokenType.TRUE_TOKEN:
+            self.i += 1
             expr = TrueExpr(expr_span=token.span)
-        elif token.type == TokenType.FALSE_TOKEN:
-            i[0] += 1
+        elif token.type is TokenType.FALSE_TOKEN:
+            self.i += 1
             expr = FalseExpr(expr_span=token.span)
-        elif token.type == TokenType.STRING_TOKEN:
-            i[0] += 1
+        elif token.type is TokenType.STRING_TOKEN:
+            self.i += 1
             expr = StringExpr(token.value, expr_span=token.span)
-        elif token.type == TokenType.ENTITY_TOKEN:
-            i[0] += 1
+        elif token.type is TokenType.ENTITY_TOKEN:
+            self.i += 1
             expr = EntityExpr(token.value, expr_span=token.span)
-        elif token.type == TokenType.RESOURCE_TOKEN:
-            i[0] += 1
+        elif token.type is TokenType.RESOURCE_TOKEN:
+            self.i += 1
             expr = ResourceExpr(token.value, expr_span=token.span)
-        elif token.type == TokenType.WORD_TOKEN:
-            i[0] += 1
+        elif token.type is TokenType.WORD_TOKEN:
+            self.i += 1
             expr = IdentifierExpr(token.value, expr_span=token.span)
-        elif token.type == TokenType.NUMBER_TOKEN:
-            i[0] += 1
+        elif token.type is TokenType.NUMBER_TOKEN:
+            self.i += 1
             expr = NumberExpr(
                 self.str_to_number(token.value, token.span), token.value, expr_span=token.span
             )
@@ -1024,178 +1045,77 @@ class Parser:
         self.decrease_parsing_depth()
         return expr
 
-    def parse_factor(self, i: List[int]):
-        expr = self.parse_unary(i)
-        while True:
-            tok1 = self.peek_token(i[0])
-            if (
-                tok1
-                and tok1.type == TokenType.SPACE_TOKEN
-                and self.peek_token(i[0] + 1).type
-                in (TokenType.MULTIPLICATION_TOKEN, TokenType.DIVISION_TOKEN)
-            ):
-                i[0] += 1
-                op_token = self.consume_token(i)
-                op = op_token.type
-                self.consume_space(i)
-                right_expr = self.parse_unary(i)
-                expr = BinaryExpr(
-                    expr, op, right_expr, expr_span=expr.expr_span, op_span=op_token.span
-                )
-            else:
-                break
-        return expr
-
-    def parse_term(self, i: List[int]):
-        expr = self.parse_factor(i)
-        while True:
-            tok1 = self.peek_token(i[0])
-            if (
-                tok1
-                and tok1.type == TokenType.SPACE_TOKEN
-                and self.peek_token(i[0] + 1).type
-                in (
-                    TokenType.PLUS_TOKEN,
-                    TokenType.MINUS_TOKEN,
-                )
-            ):
-                i[0] += 1
-                op_token = self.consume_token(i)
-                op = op_token.type
-                self.consume_space(i)
-                right_expr = self.parse_factor(i)
-                expr = BinaryExpr(
-                    expr, op, right_expr, expr_span=expr.expr_span, op_span=op_token.span
-                )
-            else:
-                break
-        return expr
-
-    def parse_comparison(self, i: List[int]):
-        expr = self.parse_term(i)
+    def peek_binary_operator_precedence(self) -> int:
+        """
+        Return the precedence of the binary operator after the space at the cursor,
+        or 0 if there isn't one.
+        Raises if the file ends before the operator.
+        """
+        token_types = self.token_types
+        tokens_len = len(token_types)
+        i = self.i
+        # peek_token() is only called to report the end of the file
+        if (token_types[i] if i < tokens_len else self.peek_token(i).type) is not TokenType.SPACE_TOKEN:
+            return 0
+        op_type = token_types[i + 1] if i + 1 < tokens_len else self.peek_token(i + 1).type
+        return BINARY_OPERATOR_PRECEDENCES.get(op_type, 0)
+
+    def parse_binary(self, min_precedence: int) -> Expr:
+        """
+        Parse a chain of binary operators that bind at least as tightly as min_precedence,
+        using precedence climbing so that an operand takes a single call to reach.
+        """
+        expr = self.parse_unary()
         while True:
-            tok1 = self.peek_token(i[0])
-            if (
-                tok1
-                and tok1.type == TokenType.SPACE_TOKEN
-                and self.peek_token(i[0] + 1).type
-                in (
-                    TokenType.GREATER_OR_EQUAL_TOKEN,
-                    TokenType.GREATER_TOKEN,
-                    TokenType.LESS_OR_EQUAL_TOKEN,
-                    TokenType.LESS_TOKEN,
-                )
-            ):
-                i[0] += 1
-                op_token = self.consume_token(i)
-                op = op_token.type
-                self.consume_space(i)
-                right_expr = self.parse_term(i)
-                expr = BinaryExpr(
-                    expr, op, right_expr, expr_span=expr.expr_span, op_span=op_token.span
-                )
-            else:
-                break
-        return expr
-
-    def parse_equality(self, i: List[int]):
-        expr = self.parse_comparison(i)
-        while True:
-            tok1 = self.peek_token(i[0])
-            if (
-                tok1
-                and tok1.type == TokenType.SPACE_TOKEN
-                and self.peek_token(i[0] + 1).type
-                in (
-                    TokenType.EQUALS_TOKEN,
-                    TokenType.NOT_EQUALS_TOKEN,
-                )
-            ):
-                i[0] += 1
-                op_token = self.consume_token(i)
-                op = op_token.type
-                self.consume_space(i)
-                right_expr = self.parse_comparison(i)
-                expr = BinaryExpr(
-                    expr, op, right_expr, expr_span=expr.expr_span, op_span=op_token.span
-                )
-            else:
+            precedence = self.peek_binary_operator_precedence()
+            if precedence < min_precedence:
                 break
-        return expr
-
-    def parse_and(self, i: List[int]):
-        expr = self.parse_equality(i)
-        while True:
-            tok1 = self.peek_token(i[0])
-            if (
-                tok1
-                and tok1.type == TokenType.SPACE_TOKEN
-                and self.peek_token(i[0] + 1).type == TokenType.AND_TOKEN
-            ):
-                i[0] += 1
-                op_token = self.consume_token(i)
-                op = op_token.type
-                self.consume_space(i)
-                right_expr = self.parse_equality(i)
+            op_token = self.tokens[self.i + 1]
+            self.i += 2
+            self.consume_space()
+            # Operators are left-associative, so the right side only takes tighter ones
+            right_expr = self.parse_binary(precedence + 1)
+            if op_token.type in LOGICAL_OPERATORS:
                 expr = LogicalExpr(
-                    expr, op, right_expr, expr_span=expr.expr_span, op_span=op_token.span
+                    expr, op_token.type, right_expr, expr_span=expr.expr_span, op_span=op_token.span
                 )
             else:
-                break
-        return expr
-
-    def parse_or(self, i: List[int]):
-        expr = self.parse_and(i)
-        while True:
-            tok1 = self.peek_token(i[0])
-            if (
-                tok1
-                and tok1.type == TokenType.SPACE_TOKEN
-                and self.peek_token(i[0] + 1).type == TokenType.OR_TOKEN
-            ):
-                i[0] += 1
-                op_token = self.consume_token(i)
-                op = op_token.type
-                self.consume_space(i)
-                right_expr = self.parse_and(i)
-                expr = LogicalExpr(
-                    expr, op, right_expr, expr_span=expr.expr_span, op_span=op_token.span
+                expr = BinaryExpr(
+                    expr, op_token.type, right_expr, expr_span=expr.expr_span, op_span=op_token.span
                 )
-            else:
-                break
         return expr
 
-    def parse_expression(self, i: List[int]) -> Expr:
-        self.increase_parsing_depth(i)
-        expr = self.parse_or(i)
+    def parse_expression(self) -> Expr:
+        self.increase_parsing_depth()
+        expr = self.parse_binary(1)
         self.decrease_parsing_depth()
         return expr
 
-    def parse_if_statement(self, i: List[int]):
-        self.increase_parsing_depth(i)
+    def parse_if_statement(self) -> IfStatement:
+        self.increase_parsing_depth()
         ifs: List[Tuple[Expr, List[Statement]]] = []
         while True:
             # consume if token
-            i[0] += 1
-            self.consume_space(i)
-            condition = self.parse_expression(i)
-            if_body = self.parse_statements(i)
+            self.i += 1
+            self.consume_space()
+            condition = self.parse_expression()
+            if_body = self.parse_statements()
 
-            tok = self.peek_token(i[0])
-            if tok and tok.type == TokenType.SPACE_TOKEN:
-                i[0] += 1
+            tok = self.peek_token(self.i)
+            if tok and tok.type is TokenType.SPACE_TOKEN:
+                self.i += 1
 
-                self.consume_token_type(i, TokenType.ELSE_TOKEN)
+                self.consume_token_type(TokenType.ELSE_TOKEN)
 
                 if (
-                    self.peek_token(i[0]).type == TokenType.SPACE_TOKEN
-                    and self.peek_token(i[0] + 1).type == TokenType.IF_TOKEN
+                    self.peek_token(self.i).type is TokenType.SPACE_TOKEN
+                    and self.peek_token(self.i + 1).type is TokenType.IF_TOKEN
                 ):
-                    i[0] += 1
+                    self.i += 1
                     ifs.append((condition, if_body))
                     continue
                 else:
-                    else_body = self.parse_statements(i)
+                    else_body = self.parse_statements()
             else: 
                 else_body = []
 
@@ -1211,13 +1131,13 @@ class Parser:
         self.decrease_parsing_depth()
         return current
 
-    def parse_while_statement(self, i: List[int]):
-        self.increase_parsing_depth(i)
-        self.consume_space(i)
-        condition = self.parse_expression(i)
+    def parse_while_statement(self) -> WhileStatement:
+        self.increase_parsing_depth()
+        self.consume_space()
+        condition = self.parse_expression()
 
         self.loop_depth += 1
-        body = self.parse_statements(i)
+        body = self.parse_statements()
         self.loop_depth -= 1
 
         self.decrease_parsing_depth()
@@ -1,14 +1,17 @@
+import bisect
+import re
+import sys
 from dataclasses import dataclass
-from enum import Enum, auto
+from enum import IntEnum, auto
 from pathlib import Path
-from typing import List, Tuple
+from typing import List
 
 from .error import GrugError, SourceSpan
 
 SPACES_PER_INDENT = 4
 
 
-class TokenType(Enum):
+class TokenType(IntEnum):
     OPEN_PARENTHESIS_TOKEN = auto()
     CLOSE_PARENTHESIS_TOKEN = auto()
     OPEN_BRACE_TOKEN = auto()
@@ -92,9 +95,91 @@ class TokenType(Enum):
             TokenType.COMMENT_TOKEN: "comment",
         }.get(self, self.name)
 
+    # Before Python 3.8, IntEnum's format() ignores __str__ and gives the int,
+    # which would break every f-string that mentions a TokenType
+    def __format__(self, format_spec: str) -> str:
+        return format(str(self), format_spec)
+
+
+PUNCTUATION_TOKEN_TYPES = {
+    "(": TokenType.OPEN_PARENTHESIS_TOKEN,
+    ")": TokenType.CLOSE_PARENTHESIS_TOKEN,
+    "{": TokenType.OPEN_BRACE_TOKEN,
+    "}": TokenType.CLOSE_BRACE_TOKEN,
+    "+": TokenType.PLUS_TOKEN,
+    "-": TokenType.MINUS_TOKEN,
+    "*": TokenType.MULTIPLICATION_TOKEN,
+    "/": TokenType.DIVISION_TOKEN,
+    ",": TokenType.COMMA_TOKEN,
+    ":": TokenType.COLON_TOKEN,
+    "==": TokenType.EQUALS_TOKEN,
+    "!=": TokenType.NOT_EQUALS_TOKEN,
+    "=": TokenType.ASSIGNMENT_TOKEN,
+    ">=": TokenType.GREATER_OR_EQUAL_TOKEN,
+    ">": TokenType.GREATER_TOKEN,
+    "<=": TokenType.LESS_OR_EQUAL_TOKEN,
+    "<": TokenType.LESS_TOKEN,
+}
+
+STRING_PREFIX_TOKEN_TYPES = {
+    '"': TokenType.STRING_TOKEN,
+    "e": TokenType.ENTITY_TOKEN,
+    "r": TokenType.RESOURCE_TOKEN,
+}
+
+KEYWORDS = {
+    "and": TokenType.AND_TOKEN,
+    "or": TokenType.OR_TOKEN,
+    "not": TokenType.NOT_TOKEN,
+    "true": TokenType.TRUE_TOKEN,
+    "false": TokenType.FALSE_TOKEN,
+    "if": TokenType.IF_TOKEN,
+    "else": TokenType.ELSE_TOKEN,
+    "while": TokenType.WHILE_TOKEN,
+    "break": TokenType.BREAK_TOKEN,
+    "return": TokenType.RETURN_TOKEN,
+    "continue": TokenType.CONTINUE_TOKEN,
+    "export": TokenType.EXPORT_TOKEN,
+    "local": TokenType.LOCAL_TOKEN,
+}
+
+
+# A single alternation that every character of the source is matched by.
+# The token groups only match valid tokens, so `tokenize()` doesn't need to
+# validate them. Malformed tokens fall through to the INVALID_ groups,
+# and the final group catches any character that can't start a token.
+TOKEN_PATTERN = re.compile(
+    "|".join(
+        (
+            r"(?P<SPACE> (?! ))",
+            rf"(?P<INDENTATION>(?:{' ' * SPACES_PER_INDENT})+(?! ))",
+            r"(?P<PUNCTUATION>[=!<>]=|[(){}+\-*/,:=<>])",
+            # Entity and resource strings are prefixed with e and r,
+            # so these have to come before words
+            r'(?P<STRING>[er]?"[^"\0\\]*(?:\\(?!\n)[^"\0\\]*)*")',
+            r'(?P<INVALID_STRING>[er]?"[^"]*")',
+            r"(?P<WORD>[A-Za-z_]\w*)",
+            r"(?P<NEWLINE>\r?\n)",
+            r"(?P<NUMBER>\d+(?:\.\d+)?(?![\d.]))",
+            # A comment's text can't be empty, contain null bytes,
+            # or end with whitespace
+            r"(?P<COMMENT># [^\n\0]*[^\s\0](?![^\n]))",
+            r"(?P<INVALID_SPACES> +)",
+            r"(?P<INVALID_NUMBER>\d[\d.]*)",
+            r"(?P<INVALID_COMMENT>#[^\n]*)",
+            r"(?P<UNICODE_WORD>[^\W\d]\w*)",
+            r"(?P<UNRECOGNIZED>.)",
+        )
+    ),
+    re.DOTALL,
+)
+
 
 @dataclass
 class Token:
+    # One of these is allocated per token, so it's kept free of a __dict__
+    __slots__ = ("type", "value", "span")
+
     type: TokenType
     value: str
     span: SourceSpan
@@ -105,230 +190,79 @@ class Tokenizer:
         self.src = src
         self.file_path = file_path
 
+        # The index of the first character of every line
+        self.line_starts = [0]
+        newline_index = src.find("\n")
+        while newline_index != -1:
+            self.line_starts.append(newline_index + 1)
+            newline_index = src.find("\n", newline_index + 1)
+
     def new_error(self, err_span: SourceSpan, error_message: str) -> GrugError:
         return GrugError.new_tokenizer_error(
             self.file_path, self.src, err_span, error_message
         )
 
-    def tokenize(self):
+    def tokenize(self) -> List[Token]:
         tokens: List[Token] = []
-        src = self.src
-        i = 0
+        add_token = tokens.append
         current_line = 1
 
-        def current_span(start: int) -> SourceSpan:
-            return SourceSpan(current_line, start)
-
-        def add_token(token_type: TokenType, value: str, start: int) -> None:
-            tokens.append(Token(token_type, value, current_span(start)))
-
-        while i < len(src):
-            c = src[i]
-            if c == "(":
-                add_token(TokenType.OPEN_PARENTHESIS_TOKEN, c, i)
-                i += 1
-            elif c == ")":
-                add_token(TokenType.CLOSE_PARENTHESIS_TOKEN, c, i)
-                i += 1
-            elif c == "{":
-                add_token(TokenType.OPEN_BRACE_TOKEN, c, i)
-                i += 1
-            elif c == "}":
-                add_token(TokenType.CLOSE_BRACE_TOKEN, c, i)
-                i += 1
-            elif c == "+":
-                add_token(TokenType.PLUS_TOKEN, c, i)
-                i += 1
-            elif c == "-":
-                add_token(TokenType.MINUS_TOKEN, c, i)
-                i += 1
-            elif c == "*":
-                add_token(TokenType.MULTIPLICATION_TOKEN, c, i)
-                i += 1
-            elif c == "/":
-                add_token(TokenType.DIVISION_TOKEN, c, i)
-                i += 1
-            elif c == ",":
-                add_token(TokenType.COMMA_TOKEN, c, i)
-                i += 1
-            elif c == ":":
-                add_token(TokenType.COLON_TOKEN, c, i)
-                i += 1
-            # Hard to hit this branch when running on windows because "\r\n"
-            # is replaced with "\n" when reading the file
-            elif src.startswith("\r\n", i): # pragma: no cover
-                add_token(TokenType.NEWLINE_TOKEN, "\r\n", i)
-                current_line += 1
-                i += 2
-            elif c == "\n":
-                add_token(TokenType.NEWLINE_TOKEN, c, i)
-                current_line += 1
-                i += 1
-            elif c == "=" and i + 1 < len(src) and src[i + 1] == "=":
-                add_token(TokenType.EQUALS_TOKEN, "==", i)
-                i += 2
-            elif c == "!" and i + 1 < len(src) and src[i + 1] == "=":
-                add_token(TokenType.NOT_EQUALS_TOKEN, "!=", i)
-                i += 2
-            elif c == "=":
-                add_token(TokenType.ASSIGNMENT_TOKEN, c, i)
-                i += 1
-            elif c == ">" and i + 1 < len(src) and src[i + 1] == "=":
-                add_token(TokenType.GREATER_OR_EQUAL_TOKEN, ">=", i)
-                i += 2
-            elif c == ">":
-                add_token(TokenType.GREATER_TOKEN, ">", i)
-                i += 1
-            elif c == "<" and i + 1 < len(src) and src[i + 1] == "=":
-                add_token(TokenType.LESS_OR_EQUAL_TOKEN, "<=", i)
-                i += 2
-            elif c == "<":
-                add_token(TokenType.LESS_TOKEN, "<", i)
-                i += 1
-            elif src.startswith("and", i) and self.is_end_of_word(i + 3):
-                add_token(TokenType.AND_TOKEN, "and", i)
-                i += 3
-            elif src.startswith("or", i) and self.is_end_of_word(i + 2):
-                add_token(TokenType.OR_TOKEN, "or", i)
-                i += 2
-            elif src.startswith("not", i) and self.is_end_of_word(i + 3):
-                add_token(TokenType.NOT_TOKEN, "not", i)
-                i += 3
-            elif src.startswith("true", i) and self.is_end_of_word(i + 4):
-                add_token(TokenType.TRUE_TOKEN, "true", i)
-                i += 4
-            elif src.startswith("false", i) and self.is_end_of_word(i + 5):
-                add_token(TokenType.FALSE_TOKEN, "false", i)
-                i += 5
-            elif src.startswith("if", i) and self.is_end_of_word(i + 2):
-                add_token(TokenType.IF_TOKEN, "if", i)
-                i += 2
-            elif src.startswith("else", i) and self.is_end_of_word(i + 4):
-                add_token(TokenType.ELSE_TOKEN, "else", i)
-                i += 4
-            elif src.startswith("while", i) and self.is_end_of_word(i + 5):
-                add_token(TokenType.WHILE_TOKEN, "while", i)
-                i += 5
-            elif src.startswith("break", i) and self.is_end_of_word(i + 5):
-                add_token(TokenType.BREAK_TOKEN, "break", i)
-                i += 5
-            elif src.startswith("return", i) and self.is_end_of_word(i + 6):
-                add_token(TokenType.RETURN_TOKEN, "return", i)
-                i += 6
-            elif src.startswith("continue", i) and self.is_end_of_word(i + 8):
-                add_token(TokenType.CONTINUE_TOKEN, "continue", i)
-                i += 8
-            elif src.startswith("export", i) and self.is_end_of_word(i + 6):
-                add_token(TokenType.EXPORT_TOKEN, "export", i)
-                i += 6
-            elif src.startswith("local", i) and self.is_end_of_word(i + 5):
-                add_token(TokenType.LOCAL_TOKEN, "local", i)
-                i += 5
+        for match in TOKEN_PATTERN.finditer(self.src):
+            kind = match.lastgroup
+            value = match.group()
+            start = match.start()
+
             # spaces and indentation
-            elif c == " ":
-                if i + 1 >= len(src) or src[i + 1] != " ":
-                    add_token(TokenType.SPACE_TOKEN, " ", i)
-                    i += 1
-                    continue
-
-                old_i = i
-                while i < len(src) and src[i] == " ":
-                    i += 1
-
-                spaces = i - old_i
-
-                if spaces % SPACES_PER_INDENT != 0:
-                    raise self.new_error(
-                        current_span(old_i),
-                        f"Expected multiple of {SPACES_PER_INDENT} spaces but found {spaces} spaces",
-                    )
-
-                add_token(TokenType.INDENTATION_TOKEN, " " * spaces, old_i)
-            # Strings
-            elif c == '"':
-                token_span = current_span(i)
-                string, i, current_line = self.tokenize_string(i, current_line)
-                tokens.append(Token(TokenType.STRING_TOKEN, string, token_span))
-                i += 1
-            # Entity strings
-            elif c == "e" and i + 1 < len(src) and src[i + 1] == '"':
-                token_span = current_span(i)
-                i += 1
-                string, i, current_line = self.tokenize_string(i, current_line)
-                tokens.append(Token(TokenType.ENTITY_TOKEN, string, token_span))
-                i += 1
-            # Resource strings
-            elif c == "r" and i + 1 < len(src) and src[i + 1] == '"':
-                token_span = current_span(i)
-                i += 1
-                string, i, current_line = self.tokenize_string(i, current_line)
-                tokens.append(Token(TokenType.RESOURCE_TOKEN, string, token_span))
-                i += 1
-            # words
-            elif c.isalpha() or c == "_":
-                start = i
-                while i < len(src) and (src[i].isalnum() or src[i] == "_"):
-                    i += 1
-                add_token(TokenType.WORD_TOKEN, src[start:i], start)
+            if kind == "SPACE":
+                add_token(Token(TokenType.SPACE_TOKEN, value, SourceSpan(current_line, start)))
+            elif kind == "INDENTATION":
+                # Every line of a block has the same indentation, so they all share one string
+                value = sys.intern(value)
+                add_token(Token(TokenType.INDENTATION_TOKEN, value, SourceSpan(current_line, start)))
+            elif kind == "PUNCTUATION":
+                add_token(Token(PUNCTUATION_TOKEN_TYPES[value], value, SourceSpan(current_line, start)))
+            # words and keywords
+            elif kind == "WORD":
+                # Names repeat throughout a file, so every occurrence shares one string
+                value = sys.intern(value)
+                add_token(Token(KEYWORDS.get(value, TokenType.WORD_TOKEN), value, SourceSpan(current_line, start)))
+            elif kind == "NEWLINE":
+                add_token(Token(TokenType.NEWLINE_TOKEN, value, SourceSpan(current_line, start)))
+                current_line += 1
             # numbers
-            elif c.isdigit():
-                start = i
-                seen_period = False
-                i += 1
-                while i < len(src) and (src[i].isdigit() or src[i] == "."):
-                    if src[i] == ".":
-                        if seen_period:
-                            raise self.new_error(
-                                current_span(i),
-                                f"Encountered two '.' periods in a number on line {self.get_character_line_number(i)}",
-                            )
-                        seen_period = True
-                    i += 1
-
-                if src[i - 1] == ".":
-                    raise self.new_error(
-                        current_span(i),
-                        f"Missing digit after decimal point in '{src[start:i]}'",
-                    )
-
-                add_token(TokenType.NUMBER_TOKEN, src[start:i], start)
+            elif kind == "NUMBER":
+                add_token(Token(TokenType.NUMBER_TOKEN, value, SourceSpan(current_line, start)))
+            # strings, entity strings and resource strings
+            elif kind == "STRING":
+                prefix_len = 0 if value[0] == '"' else 1
+                string = value[prefix_len + 1 : -1]
+                add_token(Token(STRING_PREFIX_TOKEN_TYPES[value[0]], string, SourceSpan(current_line, start)))
+                current_line += string.count("\n")
             # comments
-            elif c == "#":
-                token_start = i
-                i += 1
-                if i >= len(src) or src[i] != " ":
-                    raise self.new_error(
-                        current_span(i),
-                        "Expected space (' ') after '#'",
-                    )
-                i += 1
-                start = i
-                while i < len(src) and src[i] != "\n":
-                    if src[i] == "\0":
-                        raise self.new_error(
-                            current_span(i),
-                            f"Unexpected null byte on line {self.get_character_line_number(i)}",
-                        )
-                    i += 1
-
-                comment_len = i - start
-                if comment_len == 0:
-                    raise self.new_error(
-                        current_span(i - 1),
-                        f"Expected comment to contain some text",
-                    )
-
-                if src[i - 1].isspace():
-                    raise self.new_error(
-                        current_span(i),
-                        f"A comment has trailing whitespace on line {self.get_character_line_number(i)}",
-                    )
-
-                add_token(TokenType.COMMENT_TOKEN, src[start:i], token_start)
+            elif kind == "COMMENT":
+                add_token(Token(TokenType.COMMENT_TOKEN, value[2:], SourceSpan(current_line, start)))
+            elif kind == "INVALID_SPACES":
+                raise self.new_error(
+                    SourceSpan(current_line, start),
+                    f"Expected multiple of {SPACES_PER_INDENT} spaces but found {len(value)} spaces",
+                )
+            elif kind == "INVALID_NUMBER":
+                raise self.new_number_error(value, start, current_line)
+            elif kind == "INVALID_STRING":
+                prefix_len = 0 if value[0] == '"' else 1
+                raise self.new_string_error(start + prefix_len, current_line)
+            elif kind == "INVALID_COMMENT":
+                raise self.new_comment_error(value, start, current_line)
+            # words starting with a non-ASCII letter
+            elif kind == "UNICODE_WORD" and value[0].isalpha(): # pragma: no cover
+                add_token(Token(TokenType.WORD_TOKEN, value, SourceSpan(current_line, start)))
+            # a '"' that is never closed
+            elif value == '"':
+                raise self.new_string_error(start, current_line)
             else:
                 raise self.new_error(
-                    current_span(i),
-                    f"Unrecognized character '{c}'",
+                    SourceSpan(current_line, start),
+                    f"Unrecognized character '{value[0]}'",
                 )
 
         return tokens
@@ -338,37 +272,81 @@ class Tokenizer:
         Calculate the line number for a given character index.
         Line numbers are 1-based.
         """
-        return self.src[:idx].count("\n") + 1
+        return bisect.bisect_right(self.line_starts, idx)
 
-    def is_end_of_word(self, idx: int):
-        """Check if position is at end of word (not alphanumeric or underscore)"""
-        return idx >= len(self.src) or not (
-            self.src[idx].isalnum() or self.src[idx] == "_"
+    def new_number_error(self, number: str, start: int, current_line: int) -> GrugError:
+        """
+        Find the problem in the number starting at the given index.
+        Only called on numbers that are known to be invalid.
+        """
+        if number.count(".") > 1:
+            i = start + number.index(".", number.index(".") + 1)
+            return self.new_error(
+                SourceSpan(current_line, i),
+                f"Encountered two '.' periods in a number on line {self.get_character_line_number(i)}",
+            )
+
+        return self.new_error(
+            SourceSpan(current_line, start + len(number)),
+            f"Missing digit after decimal point in '{number}'",
         )
 
-    def tokenize_string(self, i: int, current_line: int) -> Tuple[str, int, int]:
+    def new_comment_error(self, comment: str, start: int, current_line: int) -> GrugError:
+        """
+        Find the first problem in the comment starting at the given '#'.
+        Only called on comments that are known to be invalid.
+        """
+        if comment[1:2] != " ":
+            return self.new_error(
+                SourceSpan(current_line, start + 1),
+                "Expected space (' ') after '#'",
+            )
+
+        text = comment[2:]
+
+        if "\0" in text:
+            i = start + 2 + text.index("\0")
+            return self.new_error(
+                SourceSpan(current_line, i),
+                f"Unexpected null byte on line {self.get_character_line_number(i)}",
+            )
+
+        if not text:
+            return self.new_error(
+                SourceSpan(current_line, start + 1),
+                f"Expected comment to contain some text",
+            )
+
+        i = start + len(comment)
+        return self.new_error(
+            SourceSpan(current_line, i),
+            f"A comment has trailing whitespace on line {self.get_character_line_number(i)}",
+        )
+
+    def new_string_error(self, open_quote_index: int, current_line: int) -> GrugError:
+        """
+        Find the first problem in the string starting at the given quote.
+        Only called on strings that are known to be invalid.
+        """
         src = self.src
-        open_quote_index = i
+        src_len = len(src)
         open_quote_line = current_line
-        i += 1
-        start = i
-        while i < len(src) and src[i] != '"':
-            if src[i] == "\n": 
-                current_line += 1;
+        i = open_quote_index + 1
+        while i < src_len and src[i] != '"':
+            if src[i] == "\n":
+                current_line += 1
             elif src[i] == "\0":
-                raise self.new_error(
+                return self.new_error(
                     SourceSpan(current_line, i),
                     f"Unexpected null byte on line {self.get_character_line_number(i)}",
                 )
-            elif src[i] == "\\" and i + 1 < len(src) and src[i + 1] == "\n":
-                raise self.new_error(
+            elif src[i] == "\\" and i + 1 < src_len and src[i + 1] == "\n":
+                return self.new_error(
                     SourceSpan(current_line, i),
                     f"Unexpected line break in string on line {self.get_character_line_number(i)}",
                 )
             i += 1
-        if i >= len(src):
-            raise self.new_error(
-                SourceSpan(open_quote_line, open_quote_index),
-                f'Unclosed " on line {self.get_character_line_number(open_quote_index)}',
-            )
-        return src[start:i], i, current_line
+        return self.new_error(
+            SourceSpan(open_quote_line, open_quote_index),
+            f'Unclosed " on line {self.get_character_line_number(open_quote_index)}',
+        )
@@ -1,6 +1,8 @@
-from dataclasses import dataclass, field
+import re
+import sys
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 from .error import GrugError, SourceSpan
 from .parser import (
@@ -14,6 +16,7 @@ from .parser import (
     HelperFn,
     IdentifierExpr,
     IfStatement,
+    LOGICAL_OPERATORS,
     LogicalExpr,
     OnFn,
     ParenthesizedExpr,
@@ -32,6 +35,9 @@ from .tokenizer import TokenType
 
 @dataclass
 class Variable:
+    # Looked up for every identifier, so it's kept free of a __dict__
+    __slots__ = ("name", "type", "type_name")
+
     name: str
     type: Optional[Type]
     type_name: Optional[str]
@@ -39,14 +45,86 @@ class Variable:
 
 @dataclass
 class GameFn:
+    # Fields with defaults can't be combined with __slots__,
+    # so every field has to be passed
+    __slots__ = ("fn_name", "arguments", "return_type", "return_type_name")
+
     fn_name: str
-    arguments: List[Argument] = field(default_factory=lambda: [])  # pragma: no cover
-    return_type: Optional[Type] = None
-    return_type_name: Optional[str] = None
+    arguments: List[Argument]
+    return_type: Optional[Type]
+    return_type_name: Optional[str]
 
 
 ModApi = Dict[str, Dict[str, Any]]
 
+EQUALITY_OPERATORS = frozenset((TokenType.EQUALS_TOKEN, TokenType.NOT_EQUALS_TOKEN))
+COMPARISON_OPERATORS = frozenset(
+    (
+        TokenType.GREATER_OR_EQUAL_TOKEN,
+        TokenType.GREATER_TOKEN,
+        TokenType.LESS_OR_EQUAL_TOKEN,
+        TokenType.LESS_TOKEN,
+    )
+)
+ARITHMETIC_OPERATORS = frozenset(
+    (
+        TokenType.PLUS_TOKEN,
+        TokenType.MINUS_TOKEN,
+        TokenType.MULTIPLICATION_TOKEN,
+        TokenType.DIVISION_TOKEN,
+    )
+)
+
+# The parameter types that a plain string can't be passed to,
+# with how to describe them and the prefix the string is missing
+PREFIXED_STRING_KINDS = {
+    Type.ENTITY: ("an entity", "e"),
+    Type.RESOURCE: ("a resource", "r"),
+}
+
+# Resources made of plain path segments, where every '.' sits between two other characters,
+# which covers nearly all of them
+PLAIN_RESOURCE_PATTERN = re.compile(r"[^/\\.]+(?:[/.][^/\\.]+)*\Z")
+
+# Mod and entity names that only use ASCII characters, which covers nearly all of them
+ASCII_ENTITY_NAME_PATTERN = re.compile(r"[a-z0-9_\-]*\Z")
+
+
+def parse_host_functions(mod_api: ModApi) -> Dict[str, GameFn]:
+    """
+    Every file of a GrugState shares the same mod API,
+    so this is only done once, instead of for every TypePropagator.
+    """
+
+    # The type names are interned like the ones the tokenizer produces,
+    # so comparing them with each other usually stops at the pointer check
+    def parse_args(lst: List[Any]):
+        return [
+            Argument(
+                obj["name"],
+                Parser.parse_type(obj["type"]),
+                sys.intern(obj["type"]),
+                SourceSpan(0, 0),
+                SourceSpan(0, 0),
+                obj.get("resource_extension"),
+                obj.get("entity_type"),
+            )
+            for obj in lst
+        ]
+
+    def parse_game_fn(fn_name: str, fn: Dict[str, Any]):
+        return GameFn(
+            fn_name,
+            parse_args(fn.get("arguments", [])),
+            Parser.parse_type(fn["return_type"]) if "return_type" in fn else None,
+            sys.intern(fn["return_type"]) if "return_type" in fn else None,
+        )
+
+    return {
+        fn_name: parse_game_fn(fn_name, fn)
+        for fn_name, fn in mod_api["host_functions"].items()
+    }
+
 
 class TypePropagator:
     def __init__(
@@ -55,6 +133,7 @@ class TypePropagator:
         mod: str,
         entity_type: str,
         mod_api: ModApi,
+        host_functions: Dict[str, GameFn],
         file_path: Path,
         source_text: str,
     ):
@@ -62,14 +141,20 @@ class TypePropagator:
         self.mod = mod
         self.file_entity_type = entity_type
         self.mod_api = mod_api
+        self.host_functions = host_functions
         self.file_path = file_path
         self.source_text = source_text
 
-        self.on_fns: Dict[str, OnFn] = {
-            s.fn_name: s for s in ast if isinstance(s, OnFn)
-        }
-
-        self.helper_fns = {s.fn_name: s for s in ast if isinstance(s, HelperFn)}
+        self.on_fns: Dict[str, OnFn] = {}
+        self.helper_fns: Dict[str, HelperFn] = {}
+        self.global_variable_statements: List[VariableStatement] = []
+        for s in ast:
+            if isinstance(s, OnFn):
+                self.on_fns[s.fn_name] = s
+            elif isinstance(s, HelperFn):
+                self.helper_fns[s.fn_name] = s
+            elif isinstance(s, VariableStatement):
+                self.global_variable_statements.append(s)
 
         self.fn_return_type = None
         self.fn_return_type_name = None
@@ -78,34 +163,34 @@ class TypePropagator:
         self.local_variables: Dict[str, Variable] = {}
         self.global_variables: Dict[str, Variable] = {}
 
-        def parse_args(lst: List[Any]):
-            return [
-                Argument(
-                    obj["name"],
-                    Parser.parse_type(obj["type"]),
-                    obj["type"],
-                    SourceSpan(0, 0),
-                    SourceSpan(0, 0),
-                    obj.get("resource_extension"),
-                    obj.get("entity_type"),
-                )
-                for obj in lst
-            ]
-
-        def parse_game_fn(fn_name: str, fn: Dict[str, Any]):
-            return GameFn(
-                fn_name,
-                parse_args(fn.get("arguments", [])),
-                Parser.parse_type(fn["return_type"]) if "return_type" in fn else None,
-                fn.get("return_type", None),
-            )
-
-        self.host_functions = {
-            fn_name: parse_game_fn(fn_name, fn)
-            for fn_name, fn in mod_api["host_functions"].items()
+        # Strings that already passed validation, so that a mod which
+        # mentions the same entity or resource many times only checks it once
+        self.validated_entities: Set[str] = set()
+        self.validated_resources: Set[Tuple[str, Optional[str]]] = set()
+
+        # The fill method of every node type that has one,
+        # so fill_expr() and fill_statements() can dispatch with a single lookup
+        self.expr_fillers: Dict[type, Callable[[Any], None]] = {
+            IdentifierExpr: self.fill_identifier_expr,
+            UnaryExpr: self.fill_unary_expr,
+            BinaryExpr: self.fill_binary_expr,
+            LogicalExpr: self.fill_binary_expr,
+            CallExpr: self.fill_call_expr,
+            ParenthesizedExpr: self.fill_parenthesized_expr,
+        }
+        self.statement_fillers: Dict[type, Callable[[Any], None]] = {
+            VariableStatement: self.fill_variable_statement,
+            CallStatement: self.fill_call_statement,
+            IfStatement: self.fill_if_statement,
+            ReturnStatement: self.fill_return_statement,
+            WhileStatement: self.fill_while_statement,
         }
 
-        self.entity_on_functions = {values["name"]: values for values in mod_api["entities"][entity_type].get("export_functions", [])}
+        # The parameters of every export function the entity declares, in their declared order
+        self.entity_on_fn_params: Dict[str, List[Dict[str, Any]]] = {
+            values["name"]: values.get("arguments", [])
+            for values in mod_api["entities"][entity_type].get("export_functions", [])
+        }
 
     def new_error(self, err_span: SourceSpan, error_message: str) -> GrugError:
         return GrugError.new_compile_error(
@@ -153,20 +238,18 @@ class TypePropagator:
         var = Variable(name, var_type, type_name)
         self.local_variables[name] = var
 
+    @staticmethod
     def are_incompatible_types(
-        self,
         first_type: Optional[Type],
         first_type_name: Optional[str],
         second_type: Optional[Type],
         second_type_name: Optional[str],
-    ):
-        if first_type != second_type:
-            return True
-        if (
-            first_type_name == "id" and second_type == Type.ID
-        ) or first_type_name == second_type_name:
-            return False
-        return True
+    ) -> bool:
+        # Any value of an id type can be assigned to an "id"
+        return first_type != second_type or (
+            first_type_name != second_type_name
+            and not (first_type_name == "id" and second_type == Type.ID)
+        )
 
     def validate_entity_string(self, string: str, span: SourceSpan):
         if not string:
@@ -197,23 +280,39 @@ class TypePropagator:
                     f"Entity string ('{string}') cannot refer to its own mod"
                 )
 
-        for c in mod:
-            if not (c.islower() or c.isdigit() or c in ("_", "-")):
-                raise self.new_error(
-                    span,
-                    f"Entity '{string}' its mod name contains the invalid character '{c}'"
-                )
+        # The loops only run to find the invalid character,
+        # or to allow non-ASCII lowercase letters and digits
+        if not ASCII_ENTITY_NAME_PATTERN.match(mod):
+            for c in mod:  # pragma: no branch
+                if not (c.islower() or c.isdigit() or c in ("_", "-")):
+                    raise self.new_error(
+                        span,
+                        f"Entity '{string}' its mod name contains the invalid character '{c}'"
+                    )
 
-        for c in entity_name:
-            if not (c.islower() or c.isdigit() or c in ("_", "-")):
-                raise self.new_error(
-                    span,
-                    f"Entity '{string}' its entity name contains the invalid character '{c}'"
-                )
+        if not ASCII_ENTITY_NAME_PATTERN.match(entity_name):
+            for c in entity_name:  # pragma: no branch
+                if not (c.islower() or c.isdigit() or c in ("_", "-")):
+                    raise self.new_error(
+                        span,
+                        f"Entity '{string}' its entity name contains the invalid character '{c}'"
+                    )
 
     def validate_resource_string(
         self, string: str, resource_extension: Optional[str], span: SourceSpan
     ):
+        # Plain resources are known to be fine, so the individual checks
+        # only run to find out what is wrong with a resource
+        if not PLAIN_RESOURCE_PATTERN.match(string):
+            self.validate_unusual_resource_string(string, span)
+
+        if resource_extension and not string.endswith(resource_extension):
+            raise self.new_error(
+                span,
+                f"The resource '{string}' was supposed to have the extension '{resource_extension}'"
+            )
+
+    def validate_unusual_resource_string(self, string: str, span: SourceSpan):
         if not string:
             raise self.new_error(span, "Resources can't be empty strings")
 
@@ -243,7 +342,8 @@ class TypePropagator:
 
         # '.' check
         dot_index = string.find(".")
-        if dot_index != -1:
+        # Resources without a '.' that get here always fail one of the checks above
+        if dot_index != -1:  # pragma: no branch
             # String starts with "."
             if dot_index == 0:
                 if len(string) == 1 or string[1] == "/":
@@ -281,15 +381,10 @@ class TypePropagator:
                         f"Remove the '..' from the resource \"{string}\""
                     )
 
-        if string.endswith("."):
+        # Only resources like ".foo" and "foo..bar" are valid and still get here
+        if string.endswith("."):  # pragma: no branch
             raise self.new_error(span, f'resource name "{string}" cannot end with .')
 
-        if resource_extension and not string.endswith(resource_extension):
-            raise self.new_error(
-                span,
-                f"The resource '{string}' was supposed to have the extension '{resource_extension}'"
-            )
-
     def check_arguments(self, params: List[Argument], call_expr: CallExpr):
         fn_name = call_expr.fn_name
         args = call_expr.arguments
@@ -307,36 +402,43 @@ class TypePropagator:
             )
 
         for arg, param in zip(args, params):
-            if isinstance(arg, StringExpr) and param.type == Type.ENTITY:
-                raise self.new_error(
-                    arg.expr_span,
-                    f"The host function '{fn_name}' expects an entity string, so put an 'e' in front of string \"{arg.string}\""
-                )
-            elif isinstance(arg, StringExpr) and param.type == Type.RESOURCE:
-                raise self.new_error(
-                    arg.expr_span,
-                    f"The host function '{fn_name}' expects a resource string, so put an 'r' in front of string \"{arg.string}\""
-                )
+            param_type = param.type
+            param_type_name = param.type_name
 
-            if isinstance(arg, EntityExpr):
+            if isinstance(arg, StringExpr):
+                string_kind = PREFIXED_STRING_KINDS.get(param_type)
+                if string_kind:
+                    kind, prefix = string_kind
+                    raise self.new_error(
+                        arg.expr_span,
+                        f"The host function '{fn_name}' expects {kind} string, so put an '{prefix}' in front of string \"{arg.string}\""
+                    )
+            elif isinstance(arg, EntityExpr) and arg.string not in self.validated_entities:
                 self.validate_entity_string(arg.string, arg.expr_span)
-            elif isinstance(arg, ResourceExpr):
+                self.validated_entities.add(arg.string)
+            elif isinstance(arg, ResourceExpr) and (arg.string, param.resource_extension) not in self.validated_resources:
                 self.validate_resource_string(
                     arg.string, param.resource_extension, arg.expr_span
                 )
+                self.validated_resources.add((arg.string, param.resource_extension))
+
+            result = arg.result
+            result_type = result.type
 
-            if not arg.result.type:
+            if not result_type:
                 raise self.new_error(
                     arg.expr_span,
-                    f"Function call '{fn_name}' expected the type {param.type_name} for argument '{param.name}', but got a function call that doesn't return anything"
+                    f"Function call '{fn_name}' expected the type {param_type_name} for argument '{param.name}', but got a function call that doesn't return anything"
                 )
 
-            if self.are_incompatible_types(
-                param.type, param.type_name, arg.result.type, arg.result.type_name
+            # are_incompatible_types(), inlined since this runs for every argument of every call
+            if result_type != param_type or (
+                result.type_name != param_type_name
+                and not (param_type_name == "id" and result_type == Type.ID)
             ):
                 raise self.new_error(
                     arg.expr_span,
-                    f"Function call '{fn_name}' expected the type {param.type_name} for argument '{param.name}', but got {arg.result.type_name}"
+                    f"Function call '{fn_name}' expected the type {param_type_name} for argument '{param.name}', but got {result.type_name}"
                 )
 
     def fill_call_expr(self, expr: CallExpr):
@@ -368,7 +470,7 @@ class TypePropagator:
                 f"The local function '{fn_name}' was not defined by this grug file"
             )
 
-        if fn_name in self.entity_on_functions:
+        if fn_name in self.entity_on_fn_params:
             raise self.new_error(
                 expr.name_span,
                 "Mods aren't allowed to call their own export functions"
@@ -389,8 +491,8 @@ class TypePropagator:
         op = expr.operator
 
         if left.result.type == Type.STRING:
-            if op not in (TokenType.EQUALS_TOKEN, TokenType.NOT_EQUALS_TOKEN):
-                if op == TokenType.PLUS_TOKEN and right.result.type == Type.STRING:
+            if op not in EQUALITY_OPERATORS:
+                if op is TokenType.PLUS_TOKEN and right.result.type == Type.STRING:
                     raise self.new_error(
                         expr.op_span,
                         "cannot add strings with '+'"
@@ -407,82 +509,75 @@ class TypePropagator:
                 f"The left and right operand of a binary expression ({op}) must have the same type, but got {left.result.type_name} and {right.result.type_name}"
             )
 
-        if op in (TokenType.EQUALS_TOKEN, TokenType.NOT_EQUALS_TOKEN):
+        if op in EQUALITY_OPERATORS:
             expr.result.type = Type.BOOL
             expr.result.type_name = "bool"
-        elif op in (
-            TokenType.GREATER_OR_EQUAL_TOKEN,
-            TokenType.GREATER_TOKEN,
-            TokenType.LESS_OR_EQUAL_TOKEN,
-            TokenType.LESS_TOKEN,
-        ):
+        elif op in COMPARISON_OPERATORS:
             if left.result.type != Type.NUMBER:
                 raise self.new_error(expr.op_span, f"{op} operator expects number")
             expr.result.type = Type.BOOL
             expr.result.type_name = "bool"
-        elif op in (TokenType.AND_TOKEN, TokenType.OR_TOKEN):
+        elif op in LOGICAL_OPERATORS:
             if left.result.type != Type.BOOL:
                 raise self.new_error(expr.op_span, f"{op} operator expects bool")
             expr.result.type = Type.BOOL
             expr.result.type_name = "bool"
         else:
-            assert op in (
-                TokenType.PLUS_TOKEN,
-                TokenType.MINUS_TOKEN,
-                TokenType.MULTIPLICATION_TOKEN,
-                TokenType.DIVISION_TOKEN,
-            )
+            assert op in ARITHMETIC_OPERATORS
 
             if left.result.type != Type.NUMBER:
                 raise self.new_error(expr.op_span, f"{op} operator expects number")
             expr.result.type = left.result.type
             expr.result.type_name = left.result.type_name
 
-    def fill_expr(self, expr: Expr):
-        if isinstance(expr, IdentifierExpr):
-            var = self.get_variable(expr.name)
-            if not var:
+    def fill_identifier_expr(self, expr: IdentifierExpr):
+        var = self.get_variable(expr.name)
+        if not var:
+            raise self.new_error(
+                expr.expr_span, f"The variable '{expr.name}' does not exist"
+            )
+        expr.result.type = var.type
+        expr.result.type_name = var.type_name
+
+    def fill_unary_expr(self, expr: UnaryExpr):
+        op = expr.operator
+        inner = expr.expr
+
+        # Check for double unary
+        if isinstance(inner, UnaryExpr) and inner.operator == op:
+            raise self.new_error(
+                expr.op_span,
+                f"Found {op} directly next to another {op}, which can be simplified by just removing both of them"
+            )
+
+        self.fill_expr(inner)
+        expr.result.type = inner.result.type
+        expr.result.type_name = inner.result.type_name
+
+        if op is TokenType.NOT_TOKEN:
+            if expr.result.type != Type.BOOL:
                 raise self.new_error(
-                    expr.expr_span, f"The variable '{expr.name}' does not exist"
+                    expr.op_span,
+                    f"Found 'not' before {expr.result.type_name}, but it can only be put before a bool"
                 )
-            expr.result.type = var.type
-            expr.result.type_name = var.type_name
-        elif isinstance(expr, UnaryExpr):
-            op = expr.operator
-            inner = expr.expr
-
-            # Check for double unary
-            if isinstance(inner, UnaryExpr) and inner.operator == op:
+        else:
+            assert op is TokenType.MINUS_TOKEN
+            if expr.result.type != Type.NUMBER:
                 raise self.new_error(
                     expr.op_span,
-                    f"Found {op} directly next to another {op}, which can be simplified by just removing both of them"
+                    f"Found '-' before {expr.result.type_name}, but it can only be put before a number"
                 )
 
-            self.fill_expr(inner)
-            expr.result.type = inner.result.type
-            expr.result.type_name = inner.result.type_name
+    def fill_parenthesized_expr(self, expr: ParenthesizedExpr):
+        self.fill_expr(expr.expr)
+        expr.result.type = expr.expr.result.type
+        expr.result.type_name = expr.expr.result.type_name
 
-            if op == TokenType.NOT_TOKEN:
-                if expr.result.type != Type.BOOL:
-                    raise self.new_error(
-                        expr.op_span,
-                        f"Found 'not' before {expr.result.type_name}, but it can only be put before a bool"
-                    )
-            else:
-                assert op == TokenType.MINUS_TOKEN
-                if expr.result.type != Type.NUMBER:
-                    raise self.new_error(
-                        expr.op_span,
-                        f"Found '-' before {expr.result.type_name}, but it can only be put before a number"
-                    )
-        elif isinstance(expr, (BinaryExpr, LogicalExpr)):
-            self.fill_binary_expr(expr)
-        elif isinstance(expr, CallExpr):
-            self.fill_call_expr(expr)
-        elif isinstance(expr, ParenthesizedExpr):
-            self.fill_expr(expr.expr)
-            expr.result.type = expr.expr.result.type
-            expr.result.type_name = expr.expr.result.type_name
+    def fill_expr(self, expr: Expr):
+        # Literals got their type from the parser
+        filler = self.expr_fillers.get(type(expr))
+        if filler:
+            filler(expr)
 
     def fill_variable_statement(self, stmt: VariableStatement):
         # This call has to happen before the `add_local_variable()` we do below,
@@ -527,63 +622,69 @@ class TypePropagator:
                     f"Can't assign {stmt.expr.result.type_name} to '{var.name}', which has type {var.type_name}"
                 )
 
-    def remove_local_variables_in_statements(self, statements: List[Statement]):
-        """
-        Removes the local variables in the `statements` scope from `self.local_variables`,
-        as those variables are unreachable after the scope has exited.
-        """
-        for stmt in statements:
-            if isinstance(stmt, VariableStatement) and stmt.type:
-                del self.local_variables[stmt.name]
+    def fill_call_statement(self, stmt: CallStatement):
+        self.fill_call_expr(stmt.expr)
+
+    def fill_if_statement(self, stmt: IfStatement):
+        while True:
+            self.fill_expr(stmt.condition)
+            self.fill_statements(stmt.if_body)
+            if len(stmt.else_body) == 1 and isinstance(stmt.else_body[0], IfStatement):
+                stmt = stmt.else_body[0]
+            else:
+                self.fill_statements(stmt.else_body)
+                break;
+
+    def fill_return_statement(self, stmt: ReturnStatement):
+        if stmt.value:
+            self.fill_expr(stmt.value)
+
+            if not self.fn_return_type:
+                raise self.new_error(
+                    stmt.value.expr_span,
+                    f"Function '{self.filled_fn_name}' wasn't supposed to return any value"
+                )
+
+            if self.are_incompatible_types(
+                self.fn_return_type,
+                self.fn_return_type_name,
+                stmt.value.result.type,
+                stmt.value.result.type_name,
+            ):
+                raise self.new_error(
+                    stmt.value.expr_span,
+                    f"Function '{self.filled_fn_name}' is supposed to return {self.fn_return_type_name}, not {stmt.value.result.type_name}"
+                )
+        elif self.fn_return_type:
+            raise self.new_error(
+                stmt.return_span,
+                f"Function '{self.filled_fn_name}' is supposed to return a value of type {self.fn_return_type_name}"
+            )
+
+    def fill_while_statement(self, stmt: WhileStatement):
+        self.fill_expr(stmt.condition)
+        self.fill_statements(stmt.body_statements)
 
     def fill_statements(self, statements: List[Statement]):
+        statement_fillers = self.statement_fillers
+
+        # The local variables declared in this scope,
+        # which are unreachable after the scope has exited
+        declared_names: List[str] = []
+
         for stmt in statements:
-            if isinstance(stmt, VariableStatement):
-                self.fill_variable_statement(stmt)
-            elif isinstance(stmt, CallStatement):
-                self.fill_call_expr(stmt.expr)
-            elif isinstance(stmt, IfStatement):
-                while True:
-                    self.fill_expr(stmt.condition)
-                    self.fill_statements(stmt.if_body)
-                    if len(stmt.else_body) == 1 and isinstance(stmt.else_body[0], IfStatement):
-                        stmt = stmt.else_body[0]
-                    else:
-                        self.fill_statements(stmt.else_body)
-                        break;
-            elif isinstance(stmt, ReturnStatement):
-                if stmt.value:
-                    self.fill_expr(stmt.value)
-
-                    if not self.fn_return_type:
-                        raise self.new_error(
-                            stmt.value.expr_span,
-                            f"Function '{self.filled_fn_name}' wasn't supposed to return any value"
-                        )
-
-                    if self.are_incompatible_types(
-                        self.fn_return_type,
-                        self.fn_return_type_name,
-                        stmt.value.result.type,
-                        stmt.value.result.type_name,
-                    ):
-                        raise self.new_error(
-                            stmt.value.expr_span,
-                            f"Function '{self.filled_fn_name}' is supposed to return {self.fn_return_type_name}, not {stmt.value.result.type_name}"
-                        )
-                elif self.fn_return_type:
-                    raise self.new_error(
-                        stmt.return_span,
-                        f"Function '{self.filled_fn_name}' is supposed to return a value of type {self.fn_return_type_name}"
-                    )
-            elif isinstance(stmt, WhileStatement):
-                self.fill_expr(stmt.condition)
-                self.fill_statements(stmt.body_statements)
+            # Statements like break, continue and comments have nothing to fill
+            filler = statement_fillers.get(type(stmt))
+            if filler:
+                filler(stmt)
+                if isinstance(stmt, VariableStatement) and stmt.type:
+                    declared_names.append(stmt.name)
 
-        self.remove_local_variables_in_statements(statements)
+        for name in declared_names:
+            del self.local_variables[name]
 
     def add_argument_variables(self, arguments: List[Argument]):
-        self.local_variables = {}
+        self.local_variables.clear()
 
         for arg in arguments:
             self.add_local_variable(arg.name, arg.type, arg.type_name, arg.name_span)
@@ -611,26 +712,26 @@ class TypePropagator:
     def fill_on_fns(self):
         # Check for on_fns that aren't declared in the entity
         for fn_name in self.on_fns.keys():
-            if fn_name not in self.entity_on_functions:
+            if fn_name not in self.entity_on_fn_params:
                 self.filled_fn_name = fn_name
                 raise self.new_error(
                     self.on_fns[fn_name].span,
                     f"The function '{fn_name}' was not declared by entity '{self.file_entity_type}' in mod_api.json"
                 )
 
-        # Create a list of parser on_fn names for index lookup
-        parser_on_fn_names = list(self.on_fns.keys())
+        # The position of every on_fn in the file, for checking their order
+        parser_on_fn_indices = {fn_name: i for i, fn_name in enumerate(self.on_fns)}
 
         # Check ordering and validate signatures by iterating through expected order
         previous_on_fn_index = 0
-        for expected_fn_name in self.entity_on_functions.keys():
+        for expected_fn_name, params in self.entity_on_fn_params.items():
             if expected_fn_name not in self.on_fns:
                 continue
 
             fn = self.on_fns[expected_fn_name]
 
             # Check ordering
-            current_parser_index = parser_on_fn_names.index(expected_fn_name)
+            current_parser_index = parser_on_fn_indices[expected_fn_name]
             if previous_on_fn_index > current_parser_index:
                 self.filled_fn_name = expected_fn_name
                 raise self.new_error(
@@ -643,8 +744,6 @@ class TypePropagator:
             self.fn_return_type_name = None
             self.filled_fn_name = expected_fn_name
 
-            params = self.entity_on_functions[expected_fn_name].get("arguments", [])
-
             if len(fn.arguments) != len(params):
                 if len(fn.arguments) < len(params):
                     raise self.new_error(
@@ -675,60 +774,62 @@ class TypePropagator:
 
     def check_global_expr(self, expr: Expr, name: str):
         """Check that global variables don't call helper fns"""
-        if isinstance(expr, UnaryExpr):
-            self.check_global_expr(expr.expr, name)
-        elif isinstance(expr, (BinaryExpr, LogicalExpr)):
-            self.check_global_expr(expr.left_expr, name)
-            self.check_global_expr(expr.right_expr, name)
-        elif isinstance(expr, CallExpr):
-            if expr.fn_name.startswith("_"):
-                raise self.new_error(
-                    expr.name_span,
-                    f"The global variable '{name}' isn't allowed to call local functions"
-                )
-            for arg in expr.arguments:
-                self.check_global_expr(arg, name)
-        elif isinstance(expr, ParenthesizedExpr):
-            self.check_global_expr(expr.expr, name)
+        # Children are pushed right to left, so the leftmost helper fn call gets reported
+        exprs = [expr]
+        while exprs:
+            expr = exprs.pop()
+            if isinstance(expr, UnaryExpr):
+                exprs.append(expr.expr)
+            elif isinstance(expr, (BinaryExpr, LogicalExpr)):
+                exprs.append(expr.right_expr)
+                exprs.append(expr.left_expr)
+            elif isinstance(expr, CallExpr):
+                if expr.fn_name.startswith("_"):
+                    raise self.new_error(
+                        expr.name_span,
+                        f"The global variable '{name}' isn't allowed to call local functions"
+                    )
+                exprs.extend(reversed(expr.arguments))
+            elif isinstance(expr, ParenthesizedExpr):
+                exprs.append(expr.expr)
 
     def fill_global_variables(self):
         # Add the implicit 'me' variable
         self.global_variables["me"] = Variable("me", Type.ID, self.file_entity_type)
 
         # Process global variable statements
-        for stmt in self.ast:
-            if isinstance(stmt, VariableStatement):
-                # Global variables are guaranteed to be initialized
-                assert stmt.type
-                assert stmt.type_name
-                assert stmt.expr
-
-                self.check_global_expr(stmt.expr, stmt.name)
-                self.fill_expr(stmt.expr)
-
-                # Check for assignment to 'me'
-                if isinstance(stmt.expr, IdentifierExpr):
-                    if stmt.expr.name == "me":
-                        raise self.new_error(
-                            stmt.expr.expr_span,
-                            "Global variables can't be assigned 'me'"
-                        )
-
-                if self.are_incompatible_types(
-                    stmt.type,
-                    stmt.type_name,
-                    stmt.expr.result.type,
-                    stmt.expr.result.type_name,
-                ):
+        for stmt in self.global_variable_statements:
+            # Global variables are guaranteed to be initialized
+            assert stmt.type
+            assert stmt.type_name
+            assert stmt.expr
+
+            self.check_global_expr(stmt.expr, stmt.name)
+            self.fill_expr(stmt.expr)
+
+            # Check for assignment to 'me'
+            if isinstance(stmt.expr, IdentifierExpr):
+                if stmt.expr.name == "me":
                     raise self.new_error(
                         stmt.expr.expr_span,
-                        f"Can't assign {stmt.expr.result.type_name} to '{stmt.name}', which has type {stmt.type_name}"
+                        "Global variables can't be assigned 'me'"
                     )
 
-                self.add_global_variable(
-                    stmt.name, stmt.type, stmt.type_name, stmt.name_span
+            if self.are_incompatible_types(
+                stmt.type,
+                stmt.type_name,
+                stmt.expr.result.type,
+                stmt.expr.result.type_name,
+            ):
+                raise self.new_error(
+                    stmt.expr.expr_span,
+                    f"Can't assign {stmt.expr.result.type_name} to '{stmt.name}', which has type {stmt.type_name}"
                 )
 
+            self.add_global_variable(
+                stmt.name, stmt.type, stmt.type_name, stmt.name_span
+            )
+
     def fill(self):
         """Main entry point for type propagation"""
         self.fill_global_variables()
@@ -1,52 +1,82 @@
 import subprocess
+from multiprocessing.pool import ThreadPool
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parent
 COVERAGE_FILE = ROOT / ".coverage"
 RCFILE = ROOT / ".coveragerc"
 
+# Every process writes its own data file, since they run at the same time,
+# and combine_coverage() merges them into COVERAGE_FILE afterwards
 COVERAGE_BASE_CMD = [
     "coverage",
     "run",
-    "--append",
+    "--parallel-mode",
     f"--data-file={COVERAGE_FILE}",
     f"--rcfile={RCFILE}",
 ]
 
 
+def run_example(example: Path):
+    example_dir = example.parent
+    print(f"\nRunning {example_dir}...")
+
+    # Use Popen to control the termination sequence,
+    # since subprocess.run(timeout=3) doesn't output coverage
+    with subprocess.Popen(
+        [*COVERAGE_BASE_CMD, example.name], cwd=example_dir
+    ) as proc:
+        try:
+            proc.communicate(timeout=1)
+        except subprocess.TimeoutExpired:
+            # Send SIGTERM instead of the uncatchable SIGKILL
+            proc.terminate()
+            # Wait for the process to execute its cleanup routines and exit
+            proc.communicate()
+
+
 def run_examples():
     examples_path = ROOT / "examples"
-    for example in sorted(examples_path.glob("*/example.py")):
-        example_dir = example.parent
-        print(f"\nRunning {example_dir}...")
-
-        # Use Popen to control the termination sequence,
-        # since subprocess.run(timeout=3) doesn't output coverage
-        with subprocess.Popen(
-            [*COVERAGE_BASE_CMD, example.name], cwd=example_dir
-        ) as proc:
-            try:
-                proc.communicate(timeout=1)
-            except subprocess.TimeoutExpired:
-                # Send SIGTERM instead of the uncatchable SIGKILL
-                proc.terminate()
-                # Wait for the process to execute its cleanup routines and exit
-                proc.communicate()
+    examples = sorted(examples_path.glob("*/example.py"))
+    # Every example runs in its own process, so a thread per CPU is enough to run them side by side.
+    # Running more at once would eat into each example's timeout
+    with ThreadPool() as pool:
+        pool.map(run_example, examples)
+
+
+def run_package_test(test_file: Path):
+    test_dir = test_file.parent
+    print(f"\nRunning {test_dir}...")
+    subprocess.run(
+        [*COVERAGE_BASE_CMD, test_file.name],
+        cwd=test_dir,
+        check=True,
+    )
 
 
 def run_package_tests():
     tests_path = ROOT / "src/grug/packages"
-    for test_file in sorted(tests_path.glob("**/tests/tests.py")):
-        test_dir = test_file.parent
-        print(f"\nRunning {test_dir}...")
-        subprocess.run(
-            [*COVERAGE_BASE_CMD, test_file.name],
-            cwd=test_dir,
-            check=True,
-        )
+    test_files = sorted(tests_path.glob("**/tests/tests.py"))
+    with ThreadPool() as pool:
+        pool.map(run_package_test, test_files)
+
+
+def combine_coverage():
+    # --append keeps the coverage that pytest already recorded in COVERAGE_FILE
+    subprocess.run(
+        [
+            "coverage",
+            "combine",
+            "--append",
+            f"--data-file={COVERAGE_FILE}",
+            f"--rcfile={RCFILE}",
+        ],
+        check=True,
+    )
 
 
 if __name__ == "__main__": #pragma: no cover
     print("Running all example programs and package tests...")
     run_examples()
     run_package_tests()
+    combine_coverage()
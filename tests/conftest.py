@@ -4,7 +4,7 @@ from pathlib import Path
 from typing import Optional, cast
 
 import pytest
-from tests.test_grug import GrugStateVTableStruct
+from tests.test_grug import GameFnRegistrator, GrugStateVTableStruct
 
 
 def pytest_addoption(parser: pytest.Parser) -> None:
@@ -64,6 +64,9 @@ def grug_lib(grug_tests_path: Path) -> ctypes.PyDLL:
     if not lib_path.is_file():  # pragma: no cover
         pytest.exit(f"Error: Shared library not found: {lib_path}")
 
+    # PyDLL keeps holding the GIL during calls, unlike CDLL.
+    # Nothing else runs Python code during the tests, so releasing it would only
+    # cost a release and reacquire for every game function call and callback
     lib = ctypes.PyDLL(str(lib_path))
 
     lib.grug_tests_runtime_error_handler.argtypes = [
@@ -83,3 +86,12 @@ def grug_lib(grug_tests_path: Path) -> ctypes.PyDLL:
     lib.grug_tests_run.restype = None
 
     return lib
+
+
+@pytest.fixture(scope="session")
+def game_fn_registrator(grug_tests_path: Path, grug_lib: ctypes.PyDLL) -> GameFnRegistrator:
+    """
+    Looks up the game functions in tests.so once per session,
+    instead of every time the tests create a GrugState
+    """
+    return GameFnRegistrator(grug_lib, grug_tests_path / "mod_api.json")
@@ -0,0 +1,51 @@
+"""
+The ctypes definitions that the tests and benchmarks.py share.
+
+They're kept out of test_grug.py, so that benchmarks.py doesn't have to import pytest.
+"""
+
+import ctypes
+
+
+class GrugValueUnion(ctypes.Union):
+    _fields_ = [
+        ("_number", ctypes.c_double),
+        ("_bool", ctypes.c_bool),
+        ("_string", ctypes.c_char_p),
+        ("_id", ctypes.c_uint64),
+    ]
+
+
+# The restype of the game functions, which is an integer of the exact same size and alignment as GrugValueUnion.
+#
+# When using `ctypes.Union`, Python's logic for "return by value" is flawed.
+# It seemingly assumes complex types (like Unions) are always too large
+# for registers and must be returned via memory. It allocates a buffer,
+# passes its address to C (which C ignores), and then reads that buffer back.
+# Since C never wrote to it, you see garbage memory.
+#
+# Quoting a [cpython GitHub issue](https://github.com/python/cpython/issues/60779) from 2012:
+# > ctypes pretends to support passing arguments to C functions
+# > that are unions (not pointers to unions), but that's a lie.
+# > In fact, the underlying libffi does not support it.
+#
+# ctypes converts a c_uint64 restype straight to a Python int,
+# so no ctypes object is created for the returned bits.
+GrugValueWorkaround = ctypes.c_uint64
+
+
+def c_to_py_value(value: GrugValueUnion, typ: str):
+    # ctypes already converts the fields to float, bool, bytes and int
+    if typ == "number":
+        return value._number
+    if typ == "bool":
+        return value._bool
+    if typ == "string":
+        return value._string.decode()
+    return value._id
+
+
+# Every game function takes the state and a pointer to its arguments.
+# The arguments are passed as a c_void_p, since ctypes accepts a GrugValueUnion array for it
+# without the type check that a POINTER(GrugValueUnion) does on every call
+GAME_FN_ARGTYPES = (ctypes.c_void_p, ctypes.c_void_p)
@@ -1,50 +1,47 @@
 import ctypes
+import json
 import sys
 import traceback
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Any, Dict, List, Optional, Type, Union, cast
 
 import pytest
 
 import grug
 from grug.entity import Entity, ReraisedGameFnError, StackOverflow, TimeLimitExceeded
-from grug.grug_state import GrugFile, GrugRuntimeErrorType, GrugState
+from grug.grug_state import GameFn, GrugFile, GrugRuntimeErrorType, GrugState
 from grug.grug_value import GrugValue
+from tests.grug_ctypes import (
+    GAME_FN_ARGTYPES,
+    GrugValueUnion,
+    GrugValueWorkaround,
+    c_to_py_value,
+)
 
-class GrugValueUnion(ctypes.Union):
-    _fields_ = [
-        ("_number", ctypes.c_double),
-        ("_bool", ctypes.c_bool),
-        ("_string", ctypes.c_char_p),
-        ("_id", ctypes.c_uint64),
-    ]
 
-class GrugValueWorkaround(ctypes.Structure):
+def write_output_buffer(
+    fn_name: str, output_text: str, output_buffer: int, output_buffer_len: int
+) -> bool:
     """
-    This defines a Structure of the exact same size and alignment as GrugValueUnion.
-
-    When using `ctypes.Union`, Python's logic for "return by value" is flawed.
-    It seemingly assumes complex types (like Unions) are always too large
-    for registers and must be returned via memory. It allocates a buffer,
-    passes its address to C (which C ignores), and then reads that buffer back.
-    Since C never wrote to it, you see garbage memory.
-
-    Quoting a [cpython GitHub issue](https://github.com/python/cpython/issues/60779) from 2012:
-    > ctypes pretends to support passing arguments to C functions
-    > that are unions (not pointers to unions), but that's a lie.
-    > In fact, the underlying libffi does not support it.
+    Copies output_text into a C buffer of output_buffer_len bytes.
+    Returns True when it didn't fit, like the callbacks that call this.
     """
+    output_bytes = output_text.encode()
+    required_len = len(output_bytes) + 1  # null terminator
+
+    if required_len > output_buffer_len:  # pragma: no cover
+        print(
+            f"{fn_name}: output buffer too small "
+            f"(need {required_len} bytes, have {output_buffer_len})",
+            file=sys.stderr,
+        )
+        return True
 
-    _fields_ = [("_blob", ctypes.c_uint64)]
+    # A bytes object is always followed by a null byte,
+    # so copying required_len bytes also copies the null terminator
+    ctypes.memmove(output_buffer, output_bytes, required_len)
 
-def c_to_py_value(value: GrugValueUnion, typ: str):
-    if typ == "number":
-        return float(value._number)
-    if typ == "bool":
-        return bool(value._bool)
-    if typ == "string":
-        return ctypes.string_at(value._string).decode()
-    return int(value._id)
+    return False
 
 
 # Callback type definitions
@@ -91,6 +88,9 @@ class GrugStateVTableStruct(ctypes.Structure):
 
 _g_grug_lib: ctypes.PyDLL
 
+# The errors that grug has already passed to the runtime error handler
+RUNTIME_ERRORS = (TimeLimitExceeded, StackOverflow, ReraisedGameFnError)
+
 _grug_runtime_err: Optional[
     Union[TimeLimitExceeded, StackOverflow, ReraisedGameFnError]
 ] = None
@@ -110,7 +110,11 @@ def custom_runtime_error_handler(
     )
 
 def test_grug(
-    grug_tests_path: Path, whitelisted_test: Optional[str], grug_lib: ctypes.PyDLL
+    grug_tests_path: Path,
+    whitelisted_test: Optional[str],
+    grug_lib: ctypes.PyDLL,
+    game_fn_registrator: "GameFnRegistrator",
+    monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     global _g_grug_lib
     _g_grug_lib = grug_lib
@@ -121,12 +125,7 @@ def test_grug(
 
     current_entity: Optional[Entity] = None
 
-    @ctypes.CFUNCTYPE(
-        ctypes.c_void_p,
-        ctypes.c_void_p,
-        ctypes.c_char_p,
-        ctypes.POINTER(ctypes.c_char_p),
-    )
+    @compile_grug_file_t
     def compile_grug_file(
         state_ptr: int,
         path: bytes,
@@ -145,7 +144,7 @@ def test_grug(
             out_err[0] = str(e).encode()
             return -1
 
-    @ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p)
+    @init_globals_t
     def init_globals(state_ptr: int, file_id: int) -> None:
         nonlocal id_map
         nonlocal current_entity
@@ -160,21 +159,14 @@ def test_grug(
             assert grug_file
 
             current_entity = grug_file.create_entity()
-        except (TimeLimitExceeded, StackOverflow, ReraisedGameFnError) as e:
+        except RUNTIME_ERRORS as e:
             # Necessary, as propagating exceptions from
             # this CFUNCTYPE function doesn't work.
             _grug_runtime_err = e
         except Exception:  # pragma: no cover
             traceback.print_exc(file=sys.stderr)
 
-    @ctypes.CFUNCTYPE(
-        None,
-        ctypes.c_void_p,
-        ctypes.c_void_p,
-        ctypes.c_char_p,
-        ctypes.POINTER(GrugValueUnion),
-        ctypes.c_size_t,
-    )
+    @call_export_fn_t
     def call_export_fn(
         state_ptr: int,
         file_id: int,
@@ -199,27 +191,22 @@ def test_grug(
             assert on_fn_decl
 
             assert len(on_fn_decl.arguments) == args_len
+            # Slicing reads all arguments in one go, and never touches c_args when it's NULL
             args = [
                 c_to_py_value(arg, argument.type_name)
-                for arg, argument in zip(c_args or [], on_fn_decl.arguments)
+                for arg, argument in zip(c_args[:args_len], on_fn_decl.arguments)
             ]
 
             current_entity._run_on_fn(  # pyright: ignore[reportPrivateUsage]
                 on_fn_name, *args
             )
-        except (TimeLimitExceeded, StackOverflow, ReraisedGameFnError) as e:
+        except RUNTIME_ERRORS as e:
             # Necessary, as propagating exceptions from CFUNCTYPE doesn't work.
             _grug_runtime_err = e
         except Exception:  # pragma: no cover
             traceback.print_exc(file=sys.stderr)
 
-    @ctypes.CFUNCTYPE(
-        ctypes.c_bool,
-        ctypes.c_void_p,
-        ctypes.c_char_p,
-        ctypes.c_void_p,
-        ctypes.c_size_t,
-    )
+    @dump_file_to_json_t
     def dump_file_to_json(
         state_ptr: int,
         input_grug_buffer: bytes,
@@ -232,36 +219,15 @@ def test_grug(
             assert state
             output_text = state.dump_file_to_json(input_text)
 
-            output_bytes = output_text.encode()
-            required_len = len(output_bytes) + 1  # null terminator
-
-            if required_len > output_buffer_len:  # pragma: no cover
-                print(
-                    f"dump_file_to_json: output buffer too small "
-                    f"(need {required_len} bytes, have {output_buffer_len})",
-                    file=sys.stderr,
-                )
-                return True
-
-            # Treat buffer as writable char array
-            buf = (ctypes.c_char * output_buffer_len).from_address(output_json_buffer)
-
-            buf[: len(output_bytes)] = output_bytes
-            buf[len(output_bytes)] = b"\0"
-
-            return False
+            return write_output_buffer(
+                "dump_file_to_json", output_text, output_json_buffer, output_buffer_len
+            )
 
         except Exception:  # pragma: no cover
             traceback.print_exc(file=sys.stderr)
             return True
 
-    @ctypes.CFUNCTYPE(
-        ctypes.c_bool,
-        ctypes.c_void_p,
-        ctypes.c_char_p,
-        ctypes.c_void_p,
-        ctypes.c_size_t,
-    )
+    @generate_file_from_json_t
     def generate_file_from_json(
         state_ptr: int,
         input_json_buffer: bytes,
@@ -274,24 +240,9 @@ def test_grug(
             assert state
             output_text = state.generate_file_from_json(input_text)
 
-            output_bytes = output_text.encode()
-            required_len = len(output_bytes) + 1  # null terminator
-
-            if required_len > output_buffer_len:  # pragma: no cover
-                print(
-                    f"generate_file_from_json: output buffer too small "
-                    f"(need {required_len} bytes, have {output_buffer_len})",
-                    file=sys.stderr,
-                )
-                return True
-
-            # Treat buffer as writable char array
-            buf = (ctypes.c_char * output_buffer_len).from_address(output_grug_buffer)
-
-            buf[: len(output_bytes)] = output_bytes
-            buf[len(output_bytes)] = b"\0"
-
-            return False
+            return write_output_buffer(
+                "generate_file_from_json", output_text, output_grug_buffer, output_buffer_len
+            )
 
         except Exception:  # pragma: no cover
             traceback.print_exc(file=sys.stderr)
@@ -326,32 +277,32 @@ def test_grug(
 
         return result
 
-    # Patch the method for testing
-    Entity._run_game_fn = _test_run_game_fn  # pyright: ignore[reportPrivateUsage]
+    # Patch the method for testing, which monkeypatch undoes after the test
+    monkeypatch.setattr(Entity, "_run_game_fn", _test_run_game_fn)
 
-    @ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_char_p)
+    @game_fn_error_t
     def game_fn_error(state_ptr: int, reason: bytes) -> None:
         nonlocal _game_fn_error_reason
-        _game_fn_error_reason = ctypes.string_at(reason).decode()
+        _game_fn_error_reason = reason.decode()
 
-    @ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p)
+    @create_grug_state_t
     def create_grug_state(tests_path: bytes, mod_api_path: bytes) -> int:
         nonlocal state
         try:
             state = grug.init(
                 runtime_error_handler=custom_runtime_error_handler,
-                mod_api_path=ctypes.string_at(tests_path).decode(),
-                mods_dir_path=ctypes.string_at(mod_api_path).decode(),
+                mod_api_path=tests_path.decode(),
+                mods_dir_path=mod_api_path.decode(),
             )
         except RuntimeError:
             return 0
         except Exception:  # pragma: no cover
             traceback.print_exc(file=sys.stderr)
             return 0
-        GameFnRegistrator(state, grug_lib).register_game_fns()
+        game_fn_registrator.register_game_fns(state)
         return 42
 
-    @ctypes.CFUNCTYPE(None, ctypes.c_void_p)
+    @destroy_grug_state_t
     def destroy_grug_state(state_ptr: int):
         nonlocal state
         assert state
@@ -378,59 +329,79 @@ def test_grug(
     )
 
 
+# The game functions that tests.so exports, each prefixed with "game_fn_"
+GAME_FN_NAMES = (
+    "nothing",
+    "magic",
+    "initialize",
+    "initialize_bool",
+    "identity",
+    "max",
+    "say",
+    "sin",
+    "cos",
+    "mega",
+    "get_false",
+    "set_is_happy",
+    "mega_f32",
+    "mega_i32",
+    "draw",
+    "blocked_alrm",
+    "spawn",
+    "spawn_d",
+    "has_resource",
+    "has_entity",
+    "has_string",
+    "get_opponent",
+    "get_os",
+    "set_d",
+    "set_opponent",
+    "motherload",
+    "motherload_subless",
+    "offset_32_bit_f32",
+    "offset_32_bit_i32",
+    "offset_32_bit_string",
+    "print_csv",
+    "talk",
+    "get_position",
+    "set_position",
+    "cause_game_fn_error",
+    "call_on_b_fn",
+    "store",
+    "retrieve",
+    "box_number",
+)
+
+
 class GameFnRegistrator:
-    def __init__(self, state: GrugState, grug_lib: ctypes.PyDLL):
-        self.state = state
+    """
+    Wraps the game functions of tests.so once,
+    so that every GrugState the tests create can share them.
+    """
+
+    def __init__(self, grug_lib: ctypes.PyDLL, mod_api_path: Path):
         self.grug_lib = grug_lib
 
-    def register_game_fns(self):
-        for name in (
-            "nothing",
-            "magic",
-            "initialize",
-            "initialize_bool",
-            "identity",
-            "max",
-            "say",
-            "sin",
-            "cos",
-            "mega",
-            "get_false",
-            "set_is_happy",
-            "mega_f32",
-            "mega_i32",
-            "draw",
-            "blocked_alrm",
-            "spawn",
-            "spawn_d",
-            "has_resource",
-            "has_entity",
-            "has_string",
-            "get_opponent",
-            "get_os",
-            "set_d",
-            "set_opponent",
-            "motherload",
-            "motherload_subless",
-            "offset_32_bit_f32",
-            "offset_32_bit_i32",
-            "offset_32_bit_string",
-            "print_csv",
-            "talk",
-            "get_position",
-            "set_position",
-            "cause_game_fn_error",
-            "call_on_b_fn",
-            "store",
-            "retrieve",
-            "box_number",
-        ):
-            self._register_fn(name)
-
-    def _get_c_args(self, *args: GrugValue):
-        c_args = (GrugValueUnion * len(args))()
+        with open(mod_api_path) as f:
+            mod_api = cast(Dict[str, Any], json.load(f))
+        self.host_functions: Dict[str, Any] = mod_api["host_functions"]
+
+        self.game_fns: Dict[str, GameFn] = {}
+        for name in GAME_FN_NAMES:
+            self._add_fn(name)
+
+    def register_game_fns(self, state: GrugState):
+        for name, fn in self.game_fns.items():
+            state._register_game_fn(name, fn)  # pyright: ignore[reportPrivateUsage]
+
+    def _get_c_args(
+        self, c_args_type: "Type[ctypes.Array[GrugValueUnion]]", *args: GrugValue
+    ):
+        c_args = c_args_type()
         keepalive: List[bytes] = []
 
+        # The union fields convert plain Python values themselves,
+        # so there's no need to wrap them in a c_char_p or c_uint64 first
         for i, v in enumerate(args):
             if isinstance(v, float):
                 c_args[i]._number = v
@@ -439,45 +410,45 @@ class GameFnRegistrator:
             elif isinstance(v, str):
                 b = v.encode()
                 keepalive.append(b)
-                c_args[i]._string = ctypes.c_char_p(b)
+                c_args[i]._string = b
             else:
                 assert isinstance(v, int)
-                c_args[i]._id = ctypes.c_uint64(v)
+                c_args[i]._id = v
 
         return c_args, keepalive
 
-    def _unpack_workaround(
-        self, c_workaround: GrugValueWorkaround, return_type: str
-    ) -> GrugValue:
+    def _unpack_workaround(self, bits: int, return_type: str) -> GrugValue:
         """
-        Creates a GrugValueUnion, and copies the bits from GrugValueWorkaround into it.
-        See the GrugValueWorkaround class docs for more information.
+        Creates a GrugValueUnion from the bits that a game function returned.
+        See the GrugValueWorkaround docs for more information.
         """
-        value = GrugValueUnion()
-        ctypes.memmove(
-            ctypes.byref(value), ctypes.byref(c_workaround), ctypes.sizeof(value)
-        )
-        return c_to_py_value(value, return_type)
+        return c_to_py_value(GrugValueUnion(_id=bits), return_type)
 
-    def _register_fn(self, name: str):
+    def _add_fn(self, name: str):
         c_fn = self.grug_lib["game_fn_" + name]
 
-        c_fn.argtypes = (
-            ctypes.c_void_p,
-            ctypes.POINTER(GrugValueUnion),
-        )
+        c_fn.argtypes = GAME_FN_ARGTYPES
         c_fn.restype = GrugValueWorkaround
 
-        return_type = self.state.mod_api["host_functions"][name].get("return_type")
+        host_function = self.host_functions[name]
+        return_type = host_function.get("return_type")
+
+        # The type checker guarantees that a game function gets exactly
+        # the arguments that the mod API declares, so the array type only has to be made once
+        c_args_type = GrugValueUnion * len(host_function.get("arguments", []))
+
+        # Bound once here, so every call of fn skips looking them up on self
+        get_c_args = self._get_c_args
+        unpack_workaround = self._unpack_workaround
 
         def fn(state: GrugState, *args: GrugValue):
-            c_args, _keepalive = self._get_c_args(*args)
-            result: GrugValueWorkaround = c_fn(0, c_args)
+            c_args, _keepalive = get_c_args(c_args_type, *args)
+            result: int = c_fn(0, c_args)
             if _grug_runtime_err is not None:
                 raise _grug_runtime_err
-            return self._unpack_workaround(result, return_type)
+            return unpack_workaround(result, return_type)
 
-        self.state._register_game_fn(name, fn)  # pyright: ignore[reportPrivateUsage]
+        self.game_fns[name] = fn
 
 
 # Enables stepping through code with VS Code its Python debugger.